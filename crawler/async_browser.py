@@ -0,0 +1,208 @@
+"""
+异步浏览器管理模块
+
+BrowserManager 的 async_api 版本，用于需要并发页面操作的场景：
+同步 API 下所有 CDP 往返串行执行，而异步 API 可以通过
+asyncio.gather 在同一 context 的多个页面间重叠等待时间，
+I/O 密集的多页面提取吞吐量随页面数近线性提升。
+
+与 BrowserManager 一致，支持两种工作模式：
+  - connect（默认）：通过 CDP 连接到已打开且已登录的 Chrome 浏览器
+  - launch：启动全新的 Chromium 浏览器实例
+
+用法示例：
+    manager = AsyncBrowserManager(config)
+    page = await manager.start()
+    pages = [await manager.context.new_page() for _ in range(4)]
+    await asyncio.gather(*(p.goto(url) for p, url in zip(pages, urls)))
+    await manager.close()
+"""
+
+import os
+from typing import Optional
+
+from playwright.async_api import (
+    Browser, BrowserContext, Page, Playwright, async_playwright,
+)
+
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+class AsyncBrowserManager:
+    """浏览器生命周期管理器（异步版）"""
+
+    def __init__(self, config: dict):
+        self.full_config = config
+        self.config = config.get("browser", {})
+        self.mode = self.config.get("mode", "connect")
+        self.cdp_url = self.config.get("cdp_url", "http://localhost:9222")
+        self.headless = self.config.get("headless", False)
+        self.slow_mo = self.config.get("slow_mo", 300)
+        self.timeout = self.config.get("timeout", 30000)
+        self.download_dir = os.path.abspath(
+            self.config.get("download_dir", "./data/exports")
+        )
+        self.viewport = self.config.get("viewport", {"width": 1920, "height": 1080})
+        self.target_url_pattern = self.config.get(
+            "target_url_pattern", "pmos.sx.sgcc.com.cn"
+        )
+
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._context: Optional[BrowserContext] = None
+        self._page: Optional[Page] = None
+
+    async def start(self) -> Page:
+        """根据配置模式启动或连接浏览器"""
+        os.makedirs(self.download_dir, exist_ok=True)
+
+        if self.mode == "connect":
+            return await self._connect_existing()
+        else:
+            return await self._launch_new()
+
+    async def _connect_existing(self) -> Page:
+        """通过 CDP 连接到已打开的 Chrome 浏览器（参见 BrowserManager）"""
+        logger.info("正在通过 CDP 连接到已有 Chrome (%s)...", self.cdp_url)
+
+        self._playwright = await async_playwright().start()
+        try:
+            self._browser = await self._playwright.chromium.connect_over_cdp(
+                self.cdp_url
+            )
+        except Exception as e:
+            logger.error(
+                "无法连接到 Chrome，请确认：\n"
+                "  1. Chrome 已启动，且带 --remote-debugging-port 参数\n"
+                "     启动命令示例: google-chrome --remote-debugging-port=9222\n"
+                "  2. CDP 地址正确: %s\n"
+                "  错误: %s",
+                self.cdp_url, e,
+            )
+            await self._playwright.stop()
+            self._playwright = None
+            raise
+
+        page = self._find_target_page()
+        if page is None:
+            logger.error(
+                "已连接到 Chrome，但未找到包含「%s」的标签页。\n"
+                "请确认 Chrome 中已打开目标网站并完成登录。",
+                self.target_url_pattern,
+            )
+            raise RuntimeError(
+                f"未找到包含「{self.target_url_pattern}」的标签页"
+            )
+
+        self._page = page
+        self._page.set_default_timeout(self.timeout)
+
+        logger.info("已连接到现有页面: %s", self._page.url)
+        return self._page
+
+    def _find_target_page(self) -> Optional[Page]:
+        """在所有已打开的标签页中查找目标页面"""
+        contexts = self._browser.contexts
+        logger.debug("浏览器有 %d 个 context", len(contexts))
+
+        for ctx in contexts:
+            for page in ctx.pages:
+                if self.target_url_pattern in page.url:
+                    self._context = ctx
+                    return page
+
+        logger.warning("未找到目标页面，当前所有标签页:")
+        for ctx in contexts:
+            for page in ctx.pages:
+                logger.warning("  - %s", page.url)
+
+        return None
+
+    async def _launch_new(self) -> Page:
+        """启动全新的 Chromium 浏览器实例"""
+        if not self.headless and not os.environ.get("DISPLAY"):
+            self.headless = True
+            logger.info("检测到无 DISPLAY 环境，已自动切换为无头模式 (headless=True)")
+
+        logger.info("正在启动 Chromium 浏览器 (headless=%s)...", self.headless)
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(
+            headless=self.headless,
+            slow_mo=self.slow_mo,
+        )
+
+        self._context = await self._browser.new_context(
+            viewport=self.viewport,
+            accept_downloads=True,
+        )
+        self._context.set_default_timeout(self.timeout)
+
+        self._page = await self._context.new_page()
+        logger.info("浏览器启动成功")
+        return self._page
+
+    @property
+    def page(self) -> Page:
+        """获取当前页面"""
+        if self._page is None:
+            raise RuntimeError("浏览器尚未启动，请先调用 start()")
+        return self._page
+
+    @property
+    def context(self) -> BrowserContext:
+        """获取浏览器上下文"""
+        if self._context is None:
+            raise RuntimeError("浏览器尚未启动，请先调用 start()")
+        return self._context
+
+    async def navigate(self, url: str):
+        """导航到指定 URL"""
+        logger.info("正在导航到: %s", url)
+        await self.page.goto(url, wait_until="networkidle")
+        logger.info("页面加载完成")
+
+    async def close(self):
+        """
+        释放浏览器资源
+
+        connect 模式：只断开 CDP 连接，不关闭浏览器和页面
+        launch 模式：关闭浏览器及所有页面
+        """
+        if self.mode == "connect":
+            logger.info("正在断开浏览器连接（保持 Chrome 运行）...")
+            try:
+                if self._browser:
+                    await self._browser.close()
+                if self._playwright:
+                    await self._playwright.stop()
+            except Exception as e:
+                logger.warning("断开连接时出错: %s", e)
+        else:
+            logger.info("正在关闭浏览器...")
+            try:
+                if self._page:
+                    await self._page.close()
+                if self._context:
+                    await self._context.close()
+                if self._browser:
+                    await self._browser.close()
+                if self._playwright:
+                    await self._playwright.stop()
+            except Exception as e:
+                logger.warning("关闭浏览器时出错: %s", e)
+
+        self._page = None
+        self._context = None
+        self._browser = None
+        self._playwright = None
+        logger.info("浏览器资源已释放")
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+        return False
@@ -0,0 +1,147 @@
+"""
+异步导出处理模块
+
+ExportHandler 的 async_api 版本：同步版的 expect_download 会阻塞线程
+直到整个文件下载完成，多任务导出只能串行；异步版配合 asyncio.gather
+可以在多个页面间并发导出，网络与磁盘时间相互重叠。
+
+用法示例：
+    handlers = [AsyncExportHandler(page, config) for page in pages]
+    paths = await asyncio.gather(*(
+        h.try_export(task_name=name, date_str=date) for h, name in ...
+    ))
+
+注意：导出按钮在 iframe 内，需要通过 self.ctx 操作。
+下载事件仍然需要通过 self.page（主页面）来监听。
+"""
+
+import os
+import time
+from typing import Optional, Union
+
+from playwright.async_api import Page, Frame, TimeoutError as PlaywrightTimeout
+
+from crawler.export_handler import (ExportHandler, _AVAIL_CACHE_TTL,
+                                    _PATH_SANITIZE, _prepare_download_dir)
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+class AsyncExportHandler:
+    """导出功能处理器（异步版）"""
+
+    def __init__(self, page: Page, config: dict):
+        self.page = page
+        # ctx 指向实际操作 DOM 的上下文（Frame 或 Page）
+        self.ctx: Union[Page, Frame] = page
+        self.config = config
+        self.download_dir = _prepare_download_dir(
+            config.get("browser", {}).get("download_dir", "./data/exports")
+        )
+        # is_export_available 的去抖缓存：(页面URL, 按钮文本) -> (结果, 时间戳)
+        self._avail_cache: dict = {}
+
+    async def try_export(self, export_type: str = "原样导出",
+                         task_name: str = "", date_str: str = "",
+                         extra_label: str = "") -> Optional[str]:
+        """
+        尝试点击导出按钮并下载文件（可与其他页面的导出并发执行）
+
+        Args:
+            export_type: 导出按钮文本（"原样导出" 或 "导出"）
+            task_name: 任务名称（用于文件命名）
+            date_str: 日期字符串
+            extra_label: 额外标签（如节点名称等）
+
+        Returns:
+            下载文件路径，失败返回 None
+        """
+        logger.info("尝试导出: %s [%s]", export_type, task_name)
+
+        # 实际点击会改变按钮状态，作废本页的可用性去抖缓存
+        self._avail_cache.pop((getattr(self.ctx, "url", ""), export_type),
+                              None)
+
+        try:
+            export_btn = await self._find_export_button(export_type)
+            if export_btn is None:
+                logger.warning("未找到「%s」按钮", export_type)
+                return None
+
+            async with self.page.expect_download(timeout=30000) as download_info:
+                await export_btn.click()
+
+            download = await download_info.value
+
+            suffix = os.path.splitext(download.suggested_filename)[1] or ".csv"
+            safe_task = task_name.translate(_PATH_SANITIZE)
+            safe_extra = extra_label.translate(_PATH_SANITIZE) if extra_label else ""
+
+            if safe_extra:
+                filename = f"{safe_task}_{date_str}_{safe_extra}{suffix}"
+            else:
+                filename = f"{safe_task}_{date_str}{suffix}"
+
+            filepath = f"{self.download_dir}{os.sep}{filename}"
+
+            await download.save_as(filepath)
+            logger.info("导出文件已保存: %s", filepath)
+            return filepath
+
+        except PlaywrightTimeout:
+            logger.warning("导出超时，可能按钮不可用或无数据 [%s]", task_name)
+            return None
+        except Exception as e:
+            logger.error("导出失败 [%s]: %s", task_name, e)
+            return None
+
+    async def _find_export_button(self, export_type: str):
+        """查找导出按钮（联合选择器 + 全按钮扫描回退，参见 ExportHandler）"""
+        union_sel = ExportHandler._UNION_SEL_TEMPLATE % ((export_type,) * 4)
+        try:
+            btn = self.ctx.locator(union_sel).first
+            await btn.wait_for(state="visible", timeout=2000)
+            return btn
+        except Exception:
+            pass
+
+        # 回退：在页面内一次 evaluate 扫描所有按钮文字
+        try:
+            idx = await self.ctx.evaluate("""(txt) => {
+                const btns = document.querySelectorAll('button');
+                for (let i = 0; i < btns.length; i++) {
+                    const t = (btns[i].textContent || '').trim();
+                    if (t.includes(txt) || t.includes('导出')) return i;
+                }
+                return -1;
+            }""", export_type)
+            if idx >= 0:
+                return self.ctx.locator("button").nth(idx)
+        except Exception:
+            pass
+
+        return None
+
+    async def is_export_available(self, export_type: str = "原样导出") -> bool:
+        """检查导出按钮是否可用（带短 TTL 去抖缓存，适合高频轮询）"""
+        cache_key = (getattr(self.ctx, "url", ""), export_type)
+        cached = self._avail_cache.get(cache_key)
+        now = time.monotonic()
+        if cached is not None and now - cached[1] < _AVAIL_CACHE_TTL:
+            return cached[0]
+
+        btn = await self._find_export_button(export_type)
+        if btn is None:
+            available = False
+        else:
+            try:
+                # trial 点击原生完成可见+可用（actionability）检查，
+                # 替代 is_visible + is_enabled 的两次往返
+                await btn.click(trial=True, timeout=500)
+                available = True
+            except Exception:
+                available = False
+
+        self._avail_cache[cache_key] = (available, now)
+        return available
@@ -0,0 +1,370 @@
+"""
+异步筛选条件处理模块
+
+FilterHandler 的 async_api 版本：同步版的每次 wait_for_selector /
+evaluate 都阻塞线程，页面类型探测与筛选区域就绪等待只能串行；
+异步版用 asyncio.gather 并发发出这些相互独立的探测，
+冷启动检测时间可以压缩到最慢一条探测的耗时。
+
+保留同步版优化后的核心路径（JS 批量 evaluate、FineReport
+window.__fr 辅助对象、:text-is 精确匹配），不重复同步版中
+为兼容旧页面保留的多级 locator 回退策略；需要完整回退链的
+调用方请继续使用同步版 FilterHandler。
+
+注意：筛选控件在 iframe 内，需要通过 self.ctx 操作。
+"""
+
+import asyncio
+from typing import List, Optional, Union
+
+from playwright.async_api import Page, Frame
+
+from crawler.filter_handler import (_EL_PANEL_SEL, _EL_PANEL_READY_JS,
+                                    _EL_DATE_INPUT_SEL, _FR_HELPER_JS)
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+class AsyncFilterHandler:
+    """筛选条件处理器（异步版）"""
+
+    def __init__(self, page: Page, config: dict):
+        self.page = page
+        # ctx 指向实际操作 DOM 的上下文（Frame 或 Page）
+        self.ctx: Union[Page, Frame] = page
+        self.config = config
+        self._page_type: Optional[str] = None
+        self._filters_ready: bool = False
+        self._fr_helper_ready: bool = False
+
+    def reset_context(self):
+        """重置与当前 iframe 上下文绑定的缓存状态（切换 ctx 后调用）"""
+        self._page_type = None
+        self._filters_ready = False
+        self._fr_helper_ready = False
+
+    async def _wait_for_filters_ready(self):
+        """
+        等待筛选区域渲染完成。
+
+        Element UI 与 FineReport 两族选择器的探测相互独立，
+        用 asyncio.gather 并发等待，任一成功即就绪。
+        """
+        if self._filters_ready:
+            return
+
+        # 快路径：控件已渲染时一次 evaluate 即确认
+        try:
+            already = await self.ctx.evaluate(
+                "() => !!document.querySelector('.el-form-item, "
+                ".el-date-editor, .el-select, .el-input, "
+                ".fr-trigger-editor, .fr-form-imgboard, .para-container')"
+            )
+            if already:
+                self._filters_ready = True
+                return
+        except Exception as e:
+            logger.debug("筛选区域快路径探测失败: %s", e)
+
+        results = await asyncio.gather(
+            self.ctx.wait_for_selector(
+                ".el-form-item, .el-date-editor, .el-select, .el-input",
+                timeout=10000),
+            self.ctx.wait_for_selector(
+                ".fr-trigger-editor, .fr-form-imgboard, "
+                "input.fr-trigger-texteditor, .para-container",
+                timeout=10000),
+            return_exceptions=True,
+        )
+        if any(not isinstance(r, Exception) for r in results):
+            self._filters_ready = True
+            return
+        logger.warning("筛选区域未在预期时间出现")
+
+    async def _is_finereport_page(self) -> bool:
+        """检测是否为 FineReport 页面（一次 evaluate，结果按 ctx 缓存）"""
+        if self._page_type is not None:
+            return self._page_type == "fr"
+        try:
+            is_fr = await self.ctx.evaluate(
+                "() => !!document.querySelector('.fr-trigger-editor, "
+                ".fr-form-imgboard, .para-container')"
+            )
+        except Exception:
+            return False
+        self._page_type = "fr" if is_fr else "el"
+        return is_fr
+
+    async def _ensure_fr_helper(self):
+        """确保当前 ctx 已安装 window.__fr 辅助对象"""
+        if self._fr_helper_ready:
+            return
+        try:
+            await self.ctx.evaluate(_FR_HELPER_JS)
+            self._fr_helper_ready = True
+        except Exception as e:
+            logger.debug("注入 FineReport 辅助脚本失败: %s", e)
+
+    async def apply_filters(self, filters: dict,
+                            date_str: Optional[str] = None,
+                            page_size: Optional[int] = None):
+        """
+        并发应用一组筛选条件。
+
+        所有会打开或关闭 body 挂载浮层的操作共用一个信号量：
+        每页条数控件本身就是 el-select（其面板同样挂在 body 下，
+        面板就绪探测与选项点击都以"当前可见的面板"为目标，
+        并行时会点进别的下拉的面板），日期编辑器的点击也会
+        顺手关掉尚未选完的面板，因此一并串行化。
+
+        Args:
+            filters: {下拉标签: 选项文本}
+            date_str: 日期（YYYY-MM-DD），None 表示不设置
+            page_size: 每页条数，None 表示不设置
+        """
+        await self._wait_for_filters_ready()
+
+        panel_sem = asyncio.Semaphore(1)
+
+        async def _guarded(coro):
+            async with panel_sem:
+                await coro
+
+        tasks = []
+        if date_str:
+            tasks.append(_guarded(self.set_date(date_str)))
+        if page_size:
+            tasks.append(_guarded(self.set_page_size(page_size)))
+        tasks.extend(_guarded(self.select_dropdown_option(k, v))
+                     for k, v in filters.items())
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    # ── 下拉框 ───────────────────────────────────────────────────
+
+    async def get_dropdown_options(self, dropdown_label: str) -> List[str]:
+        """获取指定下拉框的所有选项"""
+        logger.info("获取下拉选项: %s", dropdown_label)
+        await self._wait_for_filters_ready()
+
+        if await self._is_finereport_page():
+            await self._ensure_fr_helper()
+            try:
+                result = await self.ctx.evaluate(
+                    "n => window.__fr.get(n)", dropdown_label)
+                return [str(t) for t in result if t]
+            except Exception as e:
+                logger.error("获取下拉选项失败 [%s]: %s", dropdown_label, e)
+                return []
+
+        # Element UI：打开面板后一次 evaluate 收集全部选项
+        try:
+            await self._open_dropdown_panel(dropdown_label)
+            texts = await self.ctx.evaluate("""() => {
+                const panels = [...document.querySelectorAll(
+                    '.el-select-dropdown.el-popper')];
+                const panel = panels.find(p => p.offsetParent !== null);
+                if (!panel) return [];
+                const seen = new Set();
+                for (const li of panel.querySelectorAll(
+                        '.el-select-dropdown__item')) {
+                    const s = li.querySelector('span');
+                    const t = ((s ? s.textContent : li.textContent) || '')
+                        .trim();
+                    if (t && t !== '全部') seen.add(t);
+                }
+                return [...seen];
+            }""")
+            return [str(t) for t in texts]
+        except Exception as e:
+            logger.error("获取下拉选项失败 [%s]: %s", dropdown_label, e)
+            return []
+        finally:
+            await self._close_dropdown_panel()
+
+    async def select_dropdown_option(self, dropdown_label: str,
+                                     option_text: str):
+        """选择下拉框中的指定选项"""
+        logger.info("选择下拉选项: %s = %s", dropdown_label, option_text)
+        await self._wait_for_filters_ready()
+
+        if await self._is_finereport_page():
+            await self._ensure_fr_helper()
+            success = await self.ctx.evaluate(
+                "([n, v]) => window.__fr.set(n, v)",
+                [dropdown_label, option_text])
+            if not success:
+                raise RuntimeError(
+                    f"FineReport 下拉选项设置失败: {dropdown_label} = {option_text}")
+            return
+
+        await self._open_dropdown_panel(dropdown_label)
+        status = await self.ctx.evaluate("""(target) => {
+            const panels = [...document.querySelectorAll(
+                '.el-select-dropdown.el-popper')];
+            const panel = panels.find(p => p.offsetParent !== null);
+            if (!panel) return 'no-panel';
+            const items = [...panel.querySelectorAll(
+                '.el-select-dropdown__item')];
+            const hit = items.find(li => {
+                const s = li.querySelector('span');
+                return (((s ? s.textContent : li.textContent) || '')
+                        .trim()) === target;
+            });
+            if (!hit) return 'not-found';
+            hit.scrollIntoView({block: 'center'});
+            hit.click();
+            return 'ok';
+        }""", option_text)
+        if status != 'ok':
+            await self._close_dropdown_panel()
+            raise RuntimeError(f"未在下拉选项中找到: {option_text}")
+        logger.info("已选择: %s = %s", dropdown_label, option_text)
+
+    async def _find_dropdown(self, label: str):
+        """
+        查找下拉框输入元素。
+
+        表单项匹配与属性匹配两条探测相互独立，用 asyncio.wait
+        并发等待，先命中者胜出，落败的等待立即取消；
+        查找耗时从两条探测之和降为其中较快一条。
+        """
+        by_form_item = self.ctx.locator(".el-form-item").filter(
+            has_text=label
+        ).locator(".el-select .el-input__inner").first
+        by_attr = self.ctx.locator(
+            f'[placeholder*="{label}"], [aria-label*="{label}"]'
+        ).first
+
+        probes = {
+            asyncio.ensure_future(
+                by_form_item.wait_for(state="visible", timeout=3000)
+            ): by_form_item,
+            asyncio.ensure_future(
+                by_attr.wait_for(state="visible", timeout=3000)
+            ): by_attr,
+        }
+        try:
+            pending = set(probes)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return probes[task]
+        finally:
+            for task in probes:
+                if not task.done():
+                    task.cancel()
+        logger.warning("未找到下拉框: %s", label)
+        return by_form_item
+
+    async def _open_dropdown_panel(self, dropdown_label: str):
+        """打开指定标签的下拉框面板并等待选项渲染完成"""
+        dropdown = await self._find_dropdown(dropdown_label)
+        await dropdown.click()
+        try:
+            await self.ctx.wait_for_function(_EL_PANEL_READY_JS,
+                                             timeout=3000, polling=50)
+        except Exception:
+            logger.warning("下拉面板未出现: %s", dropdown_label)
+
+    async def _close_dropdown_panel(self):
+        """关闭当前打开的下拉面板并等待其收起"""
+        try:
+            await self.page.keyboard.press("Escape")
+            await self.ctx.wait_for_selector(_EL_PANEL_SEL, state="hidden",
+                                             timeout=1000)
+        except Exception:
+            pass
+
+    # ── 日期 ─────────────────────────────────────────────────────
+
+    async def set_date(self, date_str: str):
+        """设置日期输入框（格式：YYYY-MM-DD）"""
+        logger.info("设置日期: %s", date_str)
+        await self._wait_for_filters_ready()
+
+        if await self._is_finereport_page():
+            value = await self.ctx.evaluate("""(val) => {
+                const el = document.querySelector(
+                    'div.fr-trigger-editor[widgetname="日期"]'
+                    + ' input.fr-trigger-texteditor, '
+                    + 'div[widgetname="日期"] input, '
+                    + 'input.fr-trigger-texteditor');
+                if (!el) return null;
+                el.focus();
+                el.value = val;
+                el.dispatchEvent(new Event('input', {bubbles: true}));
+                el.dispatchEvent(new Event('change', {bubbles: true}));
+                el.dispatchEvent(new KeyboardEvent('keydown',
+                    {key: 'Enter', bubbles: true}));
+                el.blur();
+                return el.value;
+            }""", date_str)
+            if value == date_str:
+                logger.info("日期已设置为: %s", date_str)
+                return
+            raise RuntimeError("未找到日期输入框")
+
+        date_input = self.ctx.locator(_EL_DATE_INPUT_SEL).first
+        await date_input.click()
+        await date_input.press("Control+a")
+        await date_input.fill(date_str)
+        await date_input.press("Tab")
+        try:
+            await self.ctx.wait_for_selector(".el-picker-panel",
+                                             state="hidden", timeout=1000)
+        except Exception:
+            pass
+        logger.info("日期已设置为: %s", date_str)
+
+    # ── 每页条数 / 查询 ──────────────────────────────────────────
+
+    async def set_page_size(self, size: int = 50):
+        """设置每页显示条数"""
+        logger.info("设置每页条数: %d", size)
+        if await self._is_finereport_page():
+            await self._ensure_fr_helper()
+            success = await self.ctx.evaluate(
+                "v => window.__fr.set('PAGESIZE', v)", str(size))
+            if not success:
+                logger.warning("FineReport 每页条数设置失败")
+            return
+
+        try:
+            await self.ctx.locator(
+                ".el-pagination .el-select .el-input__inner").first.click()
+            await self.ctx.wait_for_function(_EL_PANEL_READY_JS,
+                                             timeout=2000, polling=50)
+            await self.ctx.locator(
+                f'.el-select-dropdown__item:has-text("{size}")'
+            ).first.click()
+        except Exception as e:
+            logger.error("设置每页条数失败: %s", e)
+
+    async def click_query_button(self):
+        """点击「查询」按钮"""
+        logger.info("点击「查询」按钮")
+        btn = self.ctx.locator(
+            'div[widgetname^="SEARCH"], '
+            'div.fr-form-imgboard:has-text("查询"), '
+            'button:has-text("查询"), button:has-text("查 询")'
+        ).first
+        await btn.click()
+        # networkidle 在带心跳的页面上不可靠，等确定的正向信号
+        try:
+            await self.ctx.locator(
+                ".el-loading-mask, .fr-loading").first.wait_for(
+                state="hidden", timeout=15000)
+            await self.ctx.locator(
+                "table tbody tr, .fr-grid-row").first.wait_for(
+                state="visible", timeout=15000)
+        except Exception:
+            try:
+                await self.ctx.wait_for_load_state("domcontentloaded",
+                                                   timeout=5000)
+            except Exception:
+                pass
+        logger.info("查询已执行")
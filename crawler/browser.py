@@ -11,8 +11,12 @@
     * 脚本结束后关闭浏览器
 """
 
+import atexit
+import contextlib
 import os
-from typing import Optional
+import queue
+import threading
+from typing import Callable, Optional
 
 from playwright.sync_api import Browser, BrowserContext, Page, Playwright, sync_playwright
 
@@ -20,6 +24,133 @@ from utils.logger import get_logger
 
 logger = get_logger()
 
+# 是否有图形环境（import 时探测一次即可，进程生命周期内不会变化）
+_HAS_DISPLAY = bool(os.environ.get("DISPLAY"))
+
+# 进程级 Playwright 单例：
+# sync_playwright().start() 会拉起一个 Node 子进程（约几百毫秒），
+# 同进程内多次创建 BrowserManager（如定时调度循环）时复用同一实例
+_pw_lock = threading.Lock()
+_pw_instance: Optional[Playwright] = None
+
+# 自定义选择器引擎：elformitem=标签文本
+# 直接在浏览器端按文本筛选 .el-form-item 容器，
+# 替代 Python 侧 locator().filter(has_text=...) 的多级求值
+_EL_FORM_ITEM_ENGINE = """
+{
+    query(root, label) {
+        const items = [...root.querySelectorAll('.el-form-item')];
+        return items.find(i => i.textContent.includes(label)) || null;
+    },
+    queryAll(root, label) {
+        return [...root.querySelectorAll('.el-form-item')]
+            .filter(i => i.textContent.includes(label));
+    }
+}
+"""
+
+
+def _stop_playwright():
+    """进程退出时停止共享的 Playwright 实例"""
+    global _pw_instance
+    if _pw_instance is not None:
+        try:
+            _pw_instance.stop()
+        except Exception:
+            pass
+        _pw_instance = None
+
+
+def _get_playwright() -> Playwright:
+    """获取进程级共享的 Playwright 实例（首次调用时启动）"""
+    global _pw_instance
+    with _pw_lock:
+        if _pw_instance is None:
+            _pw_instance = sync_playwright().start()
+            # 必须在创建 browser context 之前注册
+            try:
+                _pw_instance.selectors.register(
+                    "elformitem", script=_EL_FORM_ITEM_ENGINE)
+            except Exception as e:
+                logger.debug("注册 elformitem 选择器引擎失败: %s", e)
+            atexit.register(_stop_playwright)
+        return _pw_instance
+
+
+class ContextPool:
+    """
+    BrowserContext 池（类似数据库连接池）。
+
+    Chromium 的内存占用随 context 的累积而增长，长时间运行的爬取
+    如果不断新建 context 会出现 RSS 单调上涨。池子做两件事：
+    - 限制同时存在的 context 数量（上限 max_size）
+    - 每个 context 使用 max_uses 次后强制关闭重建，释放其累积的内存
+    """
+
+    def __init__(self, factory: Callable[[], BrowserContext],
+                 max_size: int = 4, max_uses: int = 200):
+        self._factory = factory
+        self._max_size = max_size
+        self._max_uses = max_uses
+        self._idle: "queue.Queue[BrowserContext]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._created = 0
+        # 以 context 对象本身为键：按 id() 键控时，旧 context 被回收后
+        # 新对象可能复用同一 id，继承到残留的使用计数
+        self._uses: dict = {}  # context -> 已使用次数
+
+    def acquire(self) -> BrowserContext:
+        """获取一个 context（池空且未达上限时新建，否则阻塞等待归还）"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self._max_size:
+                self._created += 1
+                return self._factory()
+
+        # 已达上限，等待其他使用者归还
+        return self._idle.get()
+
+    def release(self, context: BrowserContext):
+        """归还 context；达到使用次数上限的 context 关闭并换新入池"""
+        count = self._uses.get(context, 0) + 1
+        if count >= self._max_uses:
+            logger.debug("context 已使用 %d 次，关闭换新", count)
+            self._uses.pop(context, None)
+            try:
+                context.close()
+            except Exception:
+                pass
+            # 立即补一个新 context 入池：池满后 acquire 阻塞在
+            # _idle.get() 上，只回收不补位会把等待者永久饿死
+            try:
+                self._idle.put(self._factory())
+            except Exception as e:
+                logger.error("回收后新建 context 失败: %s", e)
+                with self._lock:
+                    self._created -= 1
+        else:
+            self._uses[context] = count
+            self._idle.put(context)
+
+    def close_all(self):
+        """关闭池中所有空闲 context"""
+        while True:
+            try:
+                context = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._uses.pop(context, None)
+            try:
+                context.close()
+            except Exception:
+                pass
+            with self._lock:
+                self._created -= 1
+
 
 class BrowserManager:
     """浏览器生命周期管理器"""
@@ -36,6 +167,9 @@ class BrowserManager:
             self.config.get("download_dir", "./data/exports")
         )
         self.viewport = self.config.get("viewport", {"width": 1920, "height": 1080})
+        # 要拦截的资源类型（仅 launch 模式生效）：表格爬取不需要图片/字体等，
+        # 拦截后页面加载更快、networkidle 更早触发、内存占用更低
+        self.block_resources = set(self.config.get("block_resources", []))
         # 用于匹配目标页面的 URL 关键词
         self.target_url_pattern = self.config.get(
             "target_url_pattern", "pmos.sx.sgcc.com.cn"
@@ -45,6 +179,10 @@ class BrowserManager:
         self._browser: Optional[Browser] = None
         self._context: Optional[BrowserContext] = None
         self._page: Optional[Page] = None
+        self._context_pool: Optional[ContextPool] = None
+        # 导航计数：connect 模式下页面长期不关闭，
+        # 每隔若干次导航清理一次页面侧的资源记录，防止内存无限增长
+        self._nav_count = 0
 
     def start(self) -> Page:
         """根据配置模式启动或连接浏览器"""
@@ -67,7 +205,7 @@ class BrowserManager:
         """
         logger.info("正在通过 CDP 连接到已有 Chrome (%s)...", self.cdp_url)
 
-        self._playwright = sync_playwright().start()
+        self._playwright = _get_playwright()
         try:
             self._browser = self._playwright.chromium.connect_over_cdp(self.cdp_url)
         except Exception as e:
@@ -79,7 +217,8 @@ class BrowserManager:
                 "  错误: %s",
                 self.cdp_url, e,
             )
-            self._playwright.stop()
+            # Playwright 实例是进程级共享的，此处不停止
+            self._playwright = None
             raise
 
         # 在已有的 contexts 中查找目标页面
@@ -131,27 +270,74 @@ class BrowserManager:
     def _launch_new(self) -> Page:
         """启动全新的 Chromium 浏览器实例（原有逻辑）"""
         # 无图形环境（如 SSH 无 DISPLAY）时强制使用无头模式
-        if not self.headless and not os.environ.get("DISPLAY"):
+        if not self.headless and not _HAS_DISPLAY:
             self.headless = True
             logger.info("检测到无 DISPLAY 环境，已自动切换为无头模式 (headless=True)")
 
         logger.info("正在启动 Chromium 浏览器 (headless=%s)...", self.headless)
-        self._playwright = sync_playwright().start()
+        self._playwright = _get_playwright()
         self._browser = self._playwright.chromium.launch(
             headless=self.headless,
             slow_mo=self.slow_mo,
         )
 
-        self._context = self._browser.new_context(
-            viewport=self.viewport,
-            accept_downloads=True,
-        )
-        self._context.set_default_timeout(self.timeout)
+        self._context = self._new_context()
 
         self._page = self._context.new_page()
         logger.info("浏览器启动成功")
         return self._page
 
+    def _new_context(self) -> BrowserContext:
+        """按统一配置创建新的 BrowserContext"""
+        context = self._browser.new_context(
+            viewport=self.viewport,
+            accept_downloads=True,
+        )
+        context.set_default_timeout(self.timeout)
+
+        if self.block_resources:
+            blocked = self.block_resources
+            context.route(
+                "**/*",
+                lambda route: (
+                    route.abort()
+                    if route.request.resource_type in blocked
+                    else route.continue_()
+                ),
+            )
+            logger.info("已启用资源拦截: %s", ", ".join(sorted(blocked)))
+
+        return context
+
+    @contextlib.contextmanager
+    def with_context(self):
+        """
+        从 context 池中借用一个 BrowserContext（上下文管理器）。
+
+        仅 launch 模式有效：connect 模式不能新建/关闭用户浏览器的
+        context，此时直接复用已连接的 context。
+
+        用法：
+            with browser_manager.with_context() as ctx:
+                page = ctx.new_page()
+                ...
+        """
+        if self.mode == "connect":
+            yield self.context
+            return
+
+        if self._browser is None:
+            raise RuntimeError("浏览器尚未启动，请先调用 start()")
+
+        if self._context_pool is None:
+            self._context_pool = ContextPool(self._new_context)
+
+        context = self._context_pool.acquire()
+        try:
+            yield context
+        finally:
+            self._context_pool.release(context)
+
     @property
     def page(self) -> Page:
         """获取当前页面"""
@@ -166,12 +352,50 @@ class BrowserManager:
             raise RuntimeError("浏览器尚未启动，请先调用 start()")
         return self._context
 
+    # 每隔多少次导航执行一次页面侧内存清理
+    _CLEANUP_EVERY_NAVS = 50
+
     def navigate(self, url: str):
         """导航到指定 URL"""
         logger.info("正在导航到: %s", url)
         self.page.goto(url, wait_until="networkidle")
         logger.info("页面加载完成")
 
+        self._nav_count += 1
+        if self._nav_count % self._CLEANUP_EVERY_NAVS == 0:
+            self._cleanup_page_memory()
+
+    def _cleanup_page_memory(self):
+        """
+        清理页面侧累积的资源记录。
+
+        长时间运行（尤其 connect 模式下页面从不关闭）时，
+        performance 资源时间线等簿记会随导航次数线性增长。
+        """
+        try:
+            self.page.evaluate(
+                "() => performance.getEntries().length"
+                " && performance.clearResourceTimings()"
+            )
+            logger.debug("已清理页面资源时间线（累计导航 %d 次）", self._nav_count)
+        except Exception as e:
+            logger.debug("清理页面资源记录失败: %s", e)
+
+    def recycle_page(self):
+        """
+        回收当前页面的内存（connect 模式）。
+
+        connect 模式不能关闭用户的标签页，通过原地重新加载
+        释放页面累积的 JS 堆和渲染器内存。
+        """
+        logger.info("正在回收页面内存（重新加载当前标签页）...")
+        try:
+            self.page.goto(self.page.url, wait_until="networkidle")
+            self._cleanup_page_memory()
+            logger.info("页面已重新加载")
+        except Exception as e:
+            logger.warning("回收页面失败: %s", e)
+
     def wait_for_load(self, timeout: Optional[int] = None):
         """等待页面加载完成"""
         t = timeout or self.timeout
@@ -195,8 +419,7 @@ class BrowserManager:
                 # 注意：connect 模式下不能 close page/context，否则会关闭用户的标签页
                 if self._browser:
                     self._browser.close()   # CDP 模式下仅断开连接
-                if self._playwright:
-                    self._playwright.stop()
+                # Playwright 实例为进程级共享，进程退出时统一 stop
             except Exception as e:
                 logger.warning("断开连接时出错: %s", e)
             finally:
@@ -208,14 +431,16 @@ class BrowserManager:
         else:
             logger.info("正在关闭浏览器...")
             try:
+                if self._context_pool:
+                    self._context_pool.close_all()
+                    self._context_pool = None
                 if self._page:
                     self._page.close()
                 if self._context:
                     self._context.close()
                 if self._browser:
                     self._browser.close()
-                if self._playwright:
-                    self._playwright.stop()
+                # Playwright 实例为进程级共享，进程退出时统一 stop
             except Exception as e:
                 logger.warning("关闭浏览器时出错: %s", e)
             finally:
@@ -6,10 +6,12 @@
 下载事件仍然需要通过 self.page（主页面）来监听。
 """
 
+import functools
+import logging
 import os
+import shutil
 import time
-import glob as glob_module
-from typing import Optional, Union
+from typing import List, Optional, Union
 
 from playwright.sync_api import Page, Frame, TimeoutError as PlaywrightTimeout
 
@@ -17,19 +19,55 @@ from utils.logger import get_logger
 
 logger = get_logger()
 
+# 命中选择器缓存的有效期（秒）
+_SELECTOR_CACHE_TTL = 30.0
+
+# is_export_available 去抖缓存的有效期（秒）
+_AVAIL_CACHE_TTL = 0.5
+
+# 文件名非法字符转换表（单次 translate 替代多次链式 replace）
+_PATH_SANITIZE = str.maketrans({"/": "_", "\\": "_", ":": "_"})
+
+
+@functools.lru_cache(maxsize=None)
+def _prepare_download_dir(path: str) -> str:
+    """解析并创建下载目录（按路径缓存，同配置重复实例化时免去 stat/mkdir）"""
+    abspath = os.path.abspath(path)
+    os.makedirs(abspath, exist_ok=True)
+    return abspath
+
 
 class ExportHandler:
     """导出功能处理器"""
 
+    # 联合选择器模板（类级常量，仅按钮文本按调用参数填充，
+    # 避免每次查找都重新拼接整条 f-string）
+    _UNION_SEL_TEMPLATE = (
+        'button.x-emb-excel:has-text("%s"), '
+        'button.x-emb-excel, '
+        'button.fr-btn-text.x-emb-excel, '
+        'button:has-text("%s"), '
+        'a:has-text("%s"), '
+        'span:has-text("%s")'
+    )
+
     def __init__(self, page: Page, config: dict):
         self.page = page
         # ctx 指向实际操作 DOM 的上下文（Frame 或 Page）
         self.ctx: Union[Page, Frame] = page
         self.config = config
-        self.download_dir = os.path.abspath(
+        self.download_dir = _prepare_download_dir(
             config.get("browser", {}).get("download_dir", "./data/exports")
         )
-        os.makedirs(self.download_dir, exist_ok=True)
+        # 缓存同一页面上次命中的导出按钮选择器：(页面URL, 按钮文本) -> (选择器, 时间戳)
+        # try_export / is_export_available 重复调用时省去整条选择器探测链
+        self._selector_cache: dict = {}
+        # 历次成功导出耗时的指数移动平均（秒）：(任务名, 按钮文本) -> EMA
+        # 用于自适应收紧 expect_download 超时，"无数据" 时不必干等满 30 秒
+        self._export_ema: dict = {}
+        # is_export_available 的去抖缓存：(页面URL, 按钮文本) -> (结果, 时间戳)
+        # 高频轮询等按钮就绪时，TTL 内直接复用上次结果
+        self._avail_cache: dict = {}
 
     def try_export(self, export_type: str = "原样导出",
                     task_name: str = "", date_str: str = "",
@@ -46,8 +84,14 @@ class ExportHandler:
         Returns:
             下载文件路径，失败返回 None
         """
-        logger.info("尝试导出: %s [%s]", export_type, task_name)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("尝试导出: %s [%s]", export_type, task_name)
+
+        # 实际点击会改变按钮状态，作废本页的可用性去抖缓存
+        self._avail_cache.pop((getattr(self.ctx, "url", ""), export_type),
+                              None)
 
+        ema_key = (task_name, export_type)
         try:
             # 查找导出按钮（在 iframe 内）
             export_btn = self._find_export_button(export_type)
@@ -55,39 +99,133 @@ class ExportHandler:
                 logger.warning("未找到「%s」按钮", export_type)
                 return None
 
-            # 记录下载前的文件列表
-            before_files = set(os.listdir(self.download_dir))
+            # 使用 Playwright 的下载事件处理（download 事件在主 Page 上）。
+            # 超时取历史耗时 EMA 的两倍（下限 3 秒、上限 30 秒），
+            # 按钮存在但后端无数据时可以提早放弃
+            ema = self._export_ema.get(ema_key)
+            if ema is not None:
+                timeout_ms = max(3000, min(30000, int(ema * 2 * 1000)))
+            else:
+                timeout_ms = 30000
 
-            # 使用 Playwright 的下载事件处理（download 事件在主 Page 上）
-            with self.page.expect_download(timeout=30000) as download_info:
+            started = time.monotonic()
+            with self.page.expect_download(timeout=timeout_ms) as download_info:
                 export_btn.click()
 
             download = download_info.value
-
-            # 构造目标文件名
-            suffix = os.path.splitext(download.suggested_filename)[1] or ".csv"
-            safe_task = task_name.replace("/", "_").replace("\\", "_")
-            safe_extra = extra_label.replace("/", "_").replace("\\", "_") if extra_label else ""
-
-            if safe_extra:
-                filename = f"{safe_task}_{date_str}_{safe_extra}{suffix}"
+            elapsed = time.monotonic() - started
+            if ema is None:
+                self._export_ema[ema_key] = elapsed
             else:
-                filename = f"{safe_task}_{date_str}{suffix}"
-
-            filepath = os.path.join(self.download_dir, filename)
+                self._export_ema[ema_key] = 0.8 * ema + 0.2 * elapsed
 
-            # 保存文件
-            download.save_as(filepath)
+            filepath = self._build_filepath(download, task_name, date_str,
+                                            extra_label)
+            self._save_download(download, filepath)
             logger.info("导出文件已保存: %s", filepath)
             return filepath
 
         except PlaywrightTimeout:
+            # EMA 只在成功时更新，若收紧后的超时连续误杀偏慢的导出，
+            # 它永远得不到修正；超时即丢弃该键的 EMA，下次回到 30 秒冷启动
+            if self._export_ema.pop(ema_key, None) is not None:
+                logger.debug("导出超时，重置耗时 EMA [%s]", task_name)
             logger.warning("导出超时，可能按钮不可用或无数据 [%s]", task_name)
             return None
         except Exception as e:
             logger.error("导出失败 [%s]: %s", task_name, e)
             return None
 
+    def _build_filepath(self, download, task_name: str, date_str: str,
+                        extra_label: str) -> str:
+        """构造导出文件的目标路径（命名规则与 CsvStorage 保持一致）"""
+        suffix = os.path.splitext(download.suggested_filename)[1] or ".csv"
+        safe_task = task_name.translate(_PATH_SANITIZE)
+        safe_extra = extra_label.translate(_PATH_SANITIZE) if extra_label else ""
+
+        if safe_extra:
+            filename = f"{safe_task}_{date_str}_{safe_extra}{suffix}"
+        else:
+            filename = f"{safe_task}_{date_str}{suffix}"
+
+        return f"{self.download_dir}{os.sep}{filename}"
+
+    @staticmethod
+    def _save_download(download, filepath: str):
+        """
+        将下载结果保存到目标路径。
+
+        优先将 Playwright 已落盘的临时文件直接改名过来
+        （同文件系统下是原子 rename，免去 save_as 的整文件复制），
+        跨文件系统或取不到临时路径时回退到复制。
+        """
+        src = None
+        try:
+            src = download.path()
+        except Exception:
+            pass
+
+        if src:
+            try:
+                os.replace(src, filepath)
+            except OSError:
+                shutil.copyfile(src, filepath)
+                try:
+                    os.unlink(src)
+                except OSError:
+                    pass
+        else:
+            download.save_as(filepath)
+
+    def try_export_batch(self, tasks: List[dict]) -> List[Optional[str]]:
+        """
+        批量导出：逐个任务点击并等待对应的下载完成事件。
+
+        同步 API 下 page.on 的回调只在某个 Playwright 调用驱动连接时
+        才会派发，阻塞在普通队列上收不到事件；因此每次点击都包在
+        expect_download 里（它本身会驱动事件循环），下载和任务的
+        对应关系也由此天然确定，不依赖完成顺序。
+
+        Args:
+            tasks: 任务字典列表，每项包含 export_type / task_name /
+                   date_str / extra_label（缺省值与 try_export 相同）
+
+        Returns:
+            与 tasks 等长的文件路径列表，失败项为 None
+        """
+        results: List[Optional[str]] = [None] * len(tasks)
+
+        for idx, task in enumerate(tasks):
+            task_name = task.get("task_name", "")
+            export_type = task.get("export_type", "原样导出")
+            btn = self._find_export_button(export_type)
+            if btn is None:
+                logger.warning("未找到「%s」按钮 [%s]", export_type, task_name)
+                continue
+
+            try:
+                with self.page.expect_download(timeout=30000) as download_info:
+                    btn.click()
+                download = download_info.value
+            except PlaywrightTimeout:
+                logger.warning("等待下载超时 [%s]", task_name)
+                continue
+            except Exception as e:
+                logger.error("导出失败 [%s]: %s", task_name, e)
+                continue
+
+            filepath = self._build_filepath(
+                download,
+                task_name,
+                task.get("date_str", ""),
+                task.get("extra_label", ""),
+            )
+            self._save_download(download, filepath)
+            logger.info("导出文件已保存: %s", filepath)
+            results[idx] = filepath
+
+        return results
+
     def _find_export_button(self, export_type: str):
         """
         查找导出按钮（在 iframe 内查找）
@@ -102,35 +240,48 @@ class ExportHandler:
         Returns:
             按钮元素或 None
         """
-        # 按优先级尝试多种选择器
-        selectors = [
-            # FineReport 导出按钮
-            f'button.x-emb-excel:has-text("{export_type}")',
-            'button.x-emb-excel',
-            'button.fr-btn-text.x-emb-excel',
-            # Element UI / 标准按钮
-            f'button:has-text("{export_type}")',
-            f'a:has-text("{export_type}")',
-            f'span:has-text("{export_type}")',
-            f'text={export_type}',
-        ]
-
-        for sel in selectors:
-            try:
-                btn = self.ctx.locator(sel).first
-                if btn.is_visible():
-                    logger.debug("找到导出按钮（选择器: %s）", sel)
+        # 优先尝试本页面上次命中的选择器（短 TTL 缓存）
+        cache_key = (getattr(self.ctx, "url", ""), export_type)
+        cached = self._selector_cache.get(cache_key)
+        if cached is not None:
+            sel, cached_at = cached
+            if time.time() - cached_at < _SELECTOR_CACHE_TTL:
+                try:
+                    # wait_for 一次完成可见性校验，省去 is_visible 的额外往返
+                    btn = self.ctx.locator(sel).first
+                    btn.wait_for(state="visible", timeout=500)
+                    logger.debug("命中导出按钮选择器缓存: %s", sel)
                     return btn
-            except Exception:
-                continue
+                except Exception:
+                    pass
+            # 过期或未命中，移除后走完整探测
+            self._selector_cache.pop(cache_key, None)
 
-        # 回退：查找包含"导出"文字的按钮（含 FineReport 的按钮）
+        # 单条联合选择器一次覆盖所有候选（FineReport / Element UI / 通用文本），
+        # 替代逐个选择器探测的多次 CDP 往返
+        union_sel = self._UNION_SEL_TEMPLATE % ((export_type,) * 4)
         try:
-            btns = self.ctx.locator("button").all()
-            for btn in btns:
-                text = btn.text_content().strip()
-                if export_type in text or "导出" in text:
-                    return btn
+            btn = self.ctx.locator(union_sel).first
+            btn.wait_for(state="visible", timeout=2000)
+            logger.debug("找到导出按钮（联合选择器）")
+            self._selector_cache[cache_key] = (union_sel, time.time())
+            return btn
+        except Exception:
+            pass
+
+        # 回退：在页面内一次 evaluate 扫描所有按钮文字（含 FineReport 的按钮），
+        # 替代 .all() + 逐按钮 text_content() 的 O(N) 次 CDP 往返
+        try:
+            idx = self.ctx.evaluate("""(txt) => {
+                const btns = document.querySelectorAll('button');
+                for (let i = 0; i < btns.length; i++) {
+                    const t = (btns[i].textContent || '').trim();
+                    if (t.includes(txt) || t.includes('导出')) return i;
+                }
+                return -1;
+            }""", export_type)
+            if idx >= 0:
+                return self.ctx.locator("button").nth(idx)
         except Exception:
             pass
 
@@ -146,10 +297,23 @@ class ExportHandler:
         Returns:
             是否可用
         """
+        cache_key = (getattr(self.ctx, "url", ""), export_type)
+        cached = self._avail_cache.get(cache_key)
+        now = time.monotonic()
+        if cached is not None and now - cached[1] < _AVAIL_CACHE_TTL:
+            return cached[0]
+
         btn = self._find_export_button(export_type)
         if btn is None:
-            return False
-        try:
-            return btn.is_visible() and btn.is_enabled()
-        except Exception:
-            return False
+            available = False
+        else:
+            try:
+                # trial 点击原生完成可见+可用（actionability）检查，
+                # 替代 is_visible + is_enabled 的两次往返
+                btn.click(trial=True, timeout=500)
+                available = True
+            except Exception:
+                available = False
+
+        self._avail_cache[cache_key] = (available, now)
+        return available
@@ -7,7 +7,9 @@
 self.page 保留对主页面 Page 的引用，用于 keyboard 等仅 Page 支持的操作。
 """
 
-import time
+import functools
+import logging
+import re
 from typing import List, Optional, Union
 
 from playwright.sync_api import Page, Frame, TimeoutError as PlaywrightTimeout
@@ -17,15 +19,279 @@ from utils.logger import get_logger
 logger = get_logger()
 
 
+@functools.lru_cache(maxsize=1024)
+def _option_exact_sel(text: str) -> str:
+    """选项精确匹配选择器（按选项文本记忆化，免去循环内重复拼串）"""
+    return f'.el-select-dropdown__item:text-is("{text}")'
+
+
+@functools.lru_cache(maxsize=1024)
+def _option_fuzzy_sel(text: str) -> str:
+    """选项包含匹配选择器（has-text 兜底，记忆化同上）"""
+    return f'.el-select-dropdown__item:has-text("{text}")'
+
+# Element UI 下拉面板选择器（面板挂载在 body 上，不在 el-select 内部）
+_EL_PANEL_SEL = ".el-select-dropdown.el-popper"
+
+# FineReport combo 下拉列表项选择器（不同版本类名不一，逗号联合覆盖）
+_FR_LIST_ITEM_SEL = (
+    ".fr-combo-list-item, .fr-trigger-list .fr-trigger-item, "
+    ".fr-list-item, .x-combo-list-item"
+)
+
+# 判断当前是否有可见下拉面板的 JS 谓词（隐藏面板带 display: none 内联样式）
+_EL_PANEL_VISIBLE_JS = (
+    "document.querySelector('.el-select-dropdown.el-popper"
+    ":not([style*=\"display: none\"])') !== null"
+)
+
+# 面板可见且已渲染出选项的 JS 谓词（打开下拉后等待的完整条件）
+_EL_PANEL_READY_JS = (
+    "() => {"
+    " const ps = [...document.querySelectorAll("
+    "'.el-select-dropdown.el-popper')];"
+    " const p = ps.find(x => x.offsetParent !== null);"
+    " return !!p && p.querySelectorAll("
+    "'.el-select-dropdown__item').length > 0;"
+    " }"
+)
+
+# FineReport 日期输入框候选选择器（widgetname 精确定位优先）
+_FR_DATE_SELECTORS = (
+    'div.fr-trigger-editor[widgetname="日期"] input.fr-trigger-texteditor',
+    'div[widgetname="日期"] input.fr-trigger-texteditor',
+    'div[widgetname="日期"] input',
+    "input.fr-trigger-texteditor",
+)
+
+# Element UI / 通用日期输入框联合选择器，
+# 每段带 :visible 伪类，一次 locator 解析即可命中首个可见输入框
+_EL_DATE_INPUT_SEL = ", ".join(s + ":visible" for s in (
+    ".el-date-editor input",
+    ".el-date-editor .el-input__inner",
+    'input[placeholder*="日期"]',
+    'input[placeholder*="date"]',
+    'input[type="date"]',
+))
+
+# 筛选区域就绪的联合选择器：Element UI / FineReport / 通用控件任一出现即就绪
+# （合并为一条选择器一次等待，避免逐类探测时最坏 30 秒的串联超时）
+_FILTERS_READY_SEL = (
+    ".el-form-item, .el-date-editor, .el-select, .el-input, "
+    ".fr-trigger-editor, .fr-form-imgboard, input.fr-trigger-texteditor, "
+    ".para-container, input, select, button, form, table"
+)
+
+# 页面类型特征选择器注册表：通过 register_page_pattern 注册的新页面
+# 类型会计入筛选区域就绪检测，无需改动等待逻辑本身
+_PAGE_PATTERNS: dict = {}
+
+
+def register_page_pattern(name: str, selectors) -> None:
+    """
+    注册新页面类型的特征选择器（数据驱动扩展点）。
+
+    Args:
+        name: 页面类型名称（仅用于标识/覆盖）
+        selectors: 该页面类型筛选控件的特征 CSS 选择器序列
+    """
+    _PAGE_PATTERNS[name] = tuple(selectors)
+
+
+def _filters_ready_selector() -> str:
+    """内置就绪选择器与注册的页面类型特征选择器的联合"""
+    extra = [s for sels in _PAGE_PATTERNS.values() for s in sels]
+    if extra:
+        return _FILTERS_READY_SEL + ", " + ", ".join(extra)
+    return _FILTERS_READY_SEL
+
+
+# YYYY-MM-DD 日期格式校验（与页面内扫描用的 JS 正则保持一致）
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+# 日期输入框标签候选文本（页面内标签写法不统一，按命中率排序）
+_DATE_LABELS = ("日期", "运行日期", "查询日期", "选择日期", "日")
+
+# 表单项容器内日期输入框候选选择器（_set_date_el 策略2）
+_DATE_INPUT_SELECTORS = (
+    ".el-date-editor input",
+    ".el-date-editor .el-input__inner",
+    'input[placeholder*="日期"]',
+    'input[placeholder*="date"]',
+    ".el-input__inner",
+    "input",
+)
+
+# 表单项容器内下拉输入框候选选择器（_find_dropdown 策略1）
+_DROPDOWN_INPUT_SELECTORS = (
+    ".el-select .el-input__inner",
+    ".el-select input",
+    "input[role='combobox']",
+    "select",
+    ".el-input__inner",
+)
+
+# 在根元素下按顺序找第一个可见输入框，返回命中选择器的下标
+_PICK_VISIBLE_JS = """(root, sels) => {
+    for (let i = 0; i < sels.length; i++) {
+        const el = root.querySelector(sels[i]);
+        if (el && el.offsetParent !== null) return i;
+    }
+    return -1;
+}"""
+
+# 输入框 JS 赋值辅助函数：随 init script 注入一次，
+# 之后各调用只发送几十字节的调用载荷，且函数体可被 V8 持续优化
+_SET_INPUT_VALUE_JS = """
+if (!window.__setInputValue) {
+    window.__setInputValue = (el, val) => {
+        el.value = val;
+        el.dispatchEvent(new Event('input', { bubbles: true }));
+        el.dispatchEvent(new Event('change', { bubbles: true }));
+    };
+}
+"""
+
+# FineReport JS API 辅助对象：每个 frame 注入一次，
+# 之后各 _fr_* 方法只发送几十字节的调用载荷，
+# 免去每次 evaluate 都传整段脚本并由 V8 重新解析
+_FR_HELPER_JS = """
+if (!window.__fr) {
+    window.__fr = {
+        get: function(n) {
+            try {
+                var w = _g().parameterEl.getWidgetByName(n);
+                if (!w || typeof w.getItems !== 'function') return [];
+                return w.getItems().map(function(i) {
+                    return i.text || i.value || '';
+                }).filter(Boolean);
+            } catch (e) { return []; }
+        },
+        set: function(n, v) {
+            try {
+                var w = _g().parameterEl.getWidgetByName(n);
+                if (!w) return false;
+                w.setValue(v);
+                return true;
+            } catch (e) { return false; }
+        }
+    };
+}
+"""
+
+
 class FilterHandler:
     """筛选条件处理器"""
 
+    # 查询按钮联合选择器（一次求值覆盖 FineReport / Element UI / 通用按钮）。
+    # widgetname 属性以 "SEARCH" 开头（实际有 SEARCH, SEARCH_C, SEARCH_C_C 等变体）。
+    # 不再包含 text=查询：button/div 的 has-text 变体已覆盖其命中场景
+    _QUERY_UNION_SEL = (
+        'div[widgetname^="SEARCH"], '
+        'div.fr-form-imgboard:has-text("查询"), '
+        'div.fr-form-imgboard:has-text("查 询"), '
+        'button:has-text("查询"), button:has-text("查 询"), '
+        '.query-btn, button[type="primary"]'
+    )
+
+    # 每页条数定位选择器（Element UI 路径的回退顺序）。
+    # 类名选择器走浏览器的索引查找，排在前面；text= 引擎要全文扫描，
+    # 只在布局不标准的页面上兜底
+    _PAGE_SIZE_SELECTORS = (
+        ".el-pagination__sizes .el-select",
+        ".el-pagination .el-select",
+        "text=每页条数",
+        "text=每页展示",
+    )
+
     def __init__(self, page: Page, config: dict):
         self.page = page
         # ctx 指向实际操作 DOM 的上下文（Frame 或 Page）
         # 默认为 page，在检测到 iframe 后会被替换为 iframe 的 Frame
         self.ctx: Union[Page, Frame] = page
         self.config = config
+        # 与当前 ctx 绑定的会话缓存（reset_context 时重置）：
+        # - _page_type: 'fr' / 'el'，避免每次操作都重跑 FineReport 探测
+        # - _ready_key: 最近一次确认"筛选区域就绪"时的 (ctx标识, URL)，
+        #   同一 Frame 未导航前的重复等待直接短路
+        self._page_type: Optional[str] = None
+        self._ready_key: Optional[tuple] = None
+        # window.__fr 辅助对象是否已注入当前 ctx
+        self._fr_helper_ready: bool = False
+        # widgetname -> ElementHandle 缓存（FineReport 控件容器）
+        self._fr_widget_cache: dict = {}
+        # (下拉标签, 筛选状态键) -> 选项列表缓存
+        # 防御性重复调用 get_dropdown_options 时省去整轮开面板-收集-关面板
+        self._dd_cache: dict = {}
+        # 标签 -> 已解析下拉框 Locator 缓存
+        # _find_dropdown 的多策略探测每次都是多个 IPC 往返，命中后直接复用
+        self._dropdown_cache: dict = {}
+        # 标签 -> 已解析表单项容器 Locator 缓存（_find_form_item 同理）
+        self._form_item_cache: dict = {}
+        # (下拉标签, 选项文本) -> 已解析选项 Locator 缓存
+        # 跨日期重复选择同一选项时跳过面板内的多策略查找
+        self._option_cache: dict = {}
+        # 方法名 -> 上次命中的选择器（内联缓存：同一站点稳定命中同一条，
+        # 稳态调用跳过前面落空的候选）
+        self._winning_selectors: dict = {}
+        # 新导航的页面/iframe 自动带上辅助对象（已有页面由 _ensure_fr_helper 注入）
+        try:
+            self.page.add_init_script(_FR_HELPER_JS)
+            self.page.add_init_script(_SET_INPUT_VALUE_JS)
+        except Exception:
+            pass
+        # 把默认操作超时从浏览器级的 30s 压到 3s：多策略回退链里
+        # 元素确实不存在是常态，快速失败后换下一策略远比干等划算。
+        # 导航超时保持配置值不受影响；确实慢的操作各自显式传 timeout
+        try:
+            nav_timeout = config.get("browser", {}).get("timeout", 30000)
+            self.page.set_default_navigation_timeout(nav_timeout)
+            self.page.set_default_timeout(3000)
+        except Exception:
+            pass
+        # 页面导航后旧 Locator 全部失效，清空缓存
+        try:
+            self.page.on("framenavigated",
+                         lambda _: self._clear_locator_caches())
+        except Exception:
+            pass
+
+    def reset_context(self):
+        """
+        重置与当前 iframe 上下文绑定的缓存状态。
+
+        上层在重新检测/切换 iframe（替换 self.ctx）后必须调用，
+        否则页面类型与筛选区域就绪状态会沿用旧 Frame 的结论。
+        """
+        self._page_type = None
+        self._ready_key = None
+        self._fr_helper_ready = False
+        self._fr_widget_cache.clear()
+        self._dd_cache.clear()
+        self._clear_locator_caches()
+
+    def reattach(self, ctx: Union[Page, Frame]):
+        """
+        轻量切换操作上下文（热路径版 reset_context）。
+
+        重新拿到同一页面的 Frame 时（URL 未变，如 iframe 重新检测），
+        页面类型与筛选区域就绪等探测结论仍然成立，保留它们可以省去
+        整轮冷启动探测；绑定旧 Frame 对象的 Locator / ElementHandle
+        缓存无论如何都要重建。URL 变化则退化为完整 reset_context。
+        """
+        same_page = getattr(ctx, "url", None) == getattr(self.ctx, "url", None)
+        self.ctx = ctx
+        if same_page:
+            self._clear_locator_caches()
+            self._fr_widget_cache.clear()
+        else:
+            self.reset_context()
+
+    def _clear_locator_caches(self):
+        """清空引用旧 DOM 的 Locator 缓存（导航 / 切换 ctx 后调用）"""
+        self._dropdown_cache.clear()
+        self._form_item_cache.clear()
+        self._option_cache.clear()
 
     def _wait_for_filters_ready(self):
         """
@@ -36,70 +302,84 @@ class FilterHandler:
         - FineReport 报表页面：使用 .fr-trigger-editor, .fr-form-imgboard 等类
         - 其他页面：使用标准 HTML input, button 等
 
+        三类特征选择器合并为一条联合选择器一次等待，任一匹配立即返回。
+        就绪结论按 (ctx 标识, URL) 记号缓存：同一 Frame 未导航前的
+        重复调用直接返回，Frame 内导航（URL 变化）自动失效。
+
         处理两种异常：
         - PlaywrightTimeout: 超时但 Frame 仍有效，可以继续尝试
         - 其他异常（如 Frame was detached）: Frame 失效，需要抛出让上层重试
         """
-        try:
-            # 先尝试 Element UI 选择器
-            self.ctx.wait_for_selector(
-                ".el-form-item, .el-date-editor, .el-select, .el-input",
-                timeout=10000,
-            )
-            return
-        except PlaywrightTimeout:
-            pass
-        except Exception as e:
-            err_msg = str(e)
-            if "detached" in err_msg.lower():
-                logger.error("iframe 已 detached，需要重新检测: %s", err_msg)
-                raise
-            logger.warning("等待筛选区域时出现异常: %s", e)
+        ready_key = (id(self.ctx), getattr(self.ctx, "url", None))
+        if ready_key == self._ready_key:
             return
 
-        # 尝试 FineReport 报表选择器
+        # 快路径：控件已渲染时一次同步 evaluate 即确认就绪，
+        # 完全跳过 wait_for_selector 的轮询开销
         try:
-            self.ctx.wait_for_selector(
-                ".fr-trigger-editor, .fr-form-imgboard, "
-                "input.fr-trigger-texteditor, .para-container",
-                timeout=10000,
+            already = self.ctx.evaluate(
+                "() => !!document.querySelector('.el-form-item, "
+                ".el-date-editor, .el-select, .el-input, "
+                ".fr-trigger-editor, .fr-form-imgboard, .para-container')"
             )
-            logger.debug("通过 FineReport 选择器检测到筛选区域")
-            return
-        except PlaywrightTimeout:
-            pass
+            if already:
+                self._ready_key = ready_key
+                return
         except Exception as e:
             err_msg = str(e)
             if "detached" in err_msg.lower():
                 logger.error("iframe 已 detached，需要重新检测: %s", err_msg)
                 raise
-            logger.warning("等待筛选区域时出现异常: %s", e)
-            return
 
-        # Element UI 和 FineReport 选择器均未匹配，尝试通用选择器
-        try:
-            self.ctx.wait_for_selector(
-                "input, select, button, form, table",
-                timeout=10000,
-            )
-            logger.debug("通过通用选择器检测到筛选区域")
-        except PlaywrightTimeout:
-            logger.warning("筛选区域未在预期时间出现（Element UI、FineReport 和通用选择器均未匹配）")
-        except Exception as e:
-            err_msg = str(e)
-            if "detached" in err_msg.lower():
-                logger.error("iframe 已 detached，需要重新检测: %s", err_msg)
-                raise
-            logger.warning("等待筛选区域时出现异常: %s", e)
+        # 升格超时：500ms → 2s → 10s。热页面亚秒内即返回，
+        # 只有真正未渲染的页面才会等到最长档
+        for timeout in (500, 2000, 10000):
+            try:
+                self.ctx.wait_for_selector(_filters_ready_selector(),
+                                           timeout=timeout)
+                self._ready_key = ready_key
+                return
+            except PlaywrightTimeout:
+                continue
+            except Exception as e:
+                err_msg = str(e)
+                if "detached" in err_msg.lower():
+                    logger.error("iframe 已 detached，需要重新检测: %s", err_msg)
+                    raise
+                logger.warning("等待筛选区域时出现异常: %s", e)
+                return
+
+        logger.warning("筛选区域未在预期时间出现（Element UI、FineReport 和通用选择器均未匹配）")
 
     def _find_form_item(self, label: str):
         """根据标签文本查找对应的表单项容器"""
+        # 缓存命中：同一标签的容器直接复用，count() 一次往返验证仍在 DOM 中
+        cached = self._form_item_cache.get(label)
+        if cached is not None:
+            try:
+                if cached.count() > 0:
+                    return cached
+            except Exception:
+                pass
+            self._form_item_cache.pop(label, None)
+
+        # 策略0：自定义选择器引擎（browser.py 注册的 elformitem），
+        # 文本筛选整体在浏览器端完成；launch/connect 路径未注册时落空
+        try:
+            form_item = self.ctx.locator(f"elformitem={label}").first
+            if form_item.count() > 0 and form_item.is_visible():
+                self._form_item_cache[label] = form_item
+                return form_item
+        except Exception:
+            pass
+
         # 策略1：el-form-item 容器
         try:
             form_item = self.ctx.locator(".el-form-item").filter(
                 has_text=label
             ).first
-            if form_item and form_item.is_visible():
+            if form_item and form_item.count() > 0 and form_item.is_visible():
+                self._form_item_cache[label] = form_item
                 return form_item
         except Exception:
             pass
@@ -107,18 +387,22 @@ class FilterHandler:
         # 策略2：通过 label 文本向上查找 el-form-item 祖先
         try:
             label_el = self.ctx.locator(f"text={label}").first
-            if label_el.is_visible():
-                return label_el.locator(
+            if label_el.count() > 0 and label_el.is_visible():
+                form_item = label_el.locator(
                     "xpath=ancestor::div[contains(@class,'el-form-item')][1]"
                 )
+                self._form_item_cache[label] = form_item
+                return form_item
         except Exception:
             pass
 
         # 策略3：label 的直接父级（有些页面不使用 el-form-item）
         try:
             label_el = self.ctx.locator(f"text={label}").first
-            if label_el.is_visible():
-                return label_el.locator("..")
+            if label_el.count() > 0 and label_el.is_visible():
+                form_item = label_el.locator("..")
+                self._form_item_cache[label] = form_item
+                return form_item
         except Exception:
             pass
 
@@ -126,16 +410,66 @@ class FilterHandler:
 
     @staticmethod
     def _pick_visible_input(container, selectors: List[str]):
-        """在容器内按顺序选择第一个可见输入框"""
+        """
+        在容器内按顺序选择第一个可见输入框。
+
+        整个候选列表在页面内一次 evaluate 判定（返回命中下标），
+        只对命中的选择器再做一次 locator 绑定，
+        替代逐选择器 .first + is_visible() 的 O(N) 次往返。
+        evaluate 失败时回退到逐选择器探测。
+        """
+        try:
+            if hasattr(container, "first"):
+                # Locator：以元素本身为根
+                idx = container.evaluate(_PICK_VISIBLE_JS, selectors)
+            else:
+                # Page / Frame：以 document 为根
+                idx = container.evaluate(
+                    f"(sels) => ({_PICK_VISIBLE_JS})(document, sels)",
+                    selectors,
+                )
+            if idx is not None and idx >= 0:
+                return container.locator(selectors[idx]).first
+            return None
+        except Exception:
+            pass
+
         for sel in selectors:
             try:
                 candidate = container.locator(sel).first
-                if candidate and candidate.is_visible():
+                if candidate and candidate.count() > 0 and \
+                        candidate.is_visible():
                     return candidate
             except Exception:
                 continue
         return None
 
+    # ── 事件驱动等待（替代固定 sleep 轮询） ──────────────────────
+
+    def _wait_hidden(self, sel: str, timeout: int = 2000):
+        """等待选择器对应元素全部隐藏；超时不抛错（元素可能本来就不存在）"""
+        try:
+            self.ctx.wait_for_selector(sel, state="hidden", timeout=timeout)
+        except Exception:
+            pass
+
+    def _wait_panel_visible(self, timeout: int = 3000) -> bool:
+        """等待任一 el-select 下拉面板变为可见"""
+        try:
+            self.ctx.wait_for_function(_EL_PANEL_VISIBLE_JS, timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    def _wait_panel_ready(self, timeout: int = 3000) -> bool:
+        """等待任一 el-select 下拉面板可见且已渲染出选项（50ms 轮询）"""
+        try:
+            self.ctx.wait_for_function(_EL_PANEL_READY_JS, timeout=timeout,
+                                       polling=50)
+            return True
+        except Exception:
+            return False
+
     # ── FineReport 页面检测 ──────────────────────────────────────
 
     def _is_finereport_page(self) -> bool:
@@ -148,16 +482,67 @@ class FilterHandler:
         - 包含 .para-container（参数面板容器）
         - 包含 [widgetname] 属性的元素
 
+        探测结果按 ctx 缓存（'fr' / 'el'），同一 Frame 只数一次；
+        切换 iframe 后由 reset_context() 失效。
+
         Returns:
             True 如果是 FineReport 页面
         """
+        if self._page_type is not None:
+            return self._page_type == "fr"
         try:
             fr_count = self.ctx.locator(
                 ".fr-trigger-editor, .fr-form-imgboard, .para-container"
             ).count()
-            return fr_count > 0
         except Exception:
+            # 探测失败不缓存，下次重试
             return False
+        self._page_type = "fr" if fr_count > 0 else "el"
+        return fr_count > 0
+
+    def _get_fr_widget(self, label: str):
+        """
+        按 widgetname 解析 FineReport 控件容器，ElementHandle 缓存复用。
+
+        命中时只做一次 isConnected 检查（单次轻量往返），
+        替代每个操作都重跑整条 CSS 查询；
+        iframe 切换后由 reset_context() 清空缓存。
+
+        Args:
+            label: 控件的 widgetname（如 "节点名称"、"PAGESIZE"）
+
+        Returns:
+            控件容器的 ElementHandle 或 None
+        """
+        handle = self._fr_widget_cache.get(label)
+        if handle is not None:
+            try:
+                if handle.evaluate("el => el.isConnected"):
+                    return handle
+            except Exception:
+                pass
+            # 节点已被替换，失效重查
+            self._fr_widget_cache.pop(label, None)
+
+        try:
+            handle = self.ctx.locator(
+                f'div.fr-trigger-editor[widgetname="{label}"]'
+            ).first.element_handle(timeout=2000)
+        except Exception:
+            handle = None
+        if handle is not None:
+            self._fr_widget_cache[label] = handle
+        return handle
+
+    def _ensure_fr_helper(self):
+        """确保当前 ctx 已安装 window.__fr 辅助对象（每个 frame 只注入一次）"""
+        if self._fr_helper_ready:
+            return
+        try:
+            self.ctx.evaluate(_FR_HELPER_JS)
+            self._fr_helper_ready = True
+        except Exception as e:
+            logger.debug("注入 FineReport 辅助脚本失败: %s", e)
 
     # ── FineReport 下拉框（combo）处理 ───────────────────────────
 
@@ -176,27 +561,11 @@ class FilterHandler:
         """
         options = []
 
-        # 方法1：通过 FineReport JS API 获取选项
+        # 方法1：通过 FineReport JS API 获取选项（window.__fr 辅助对象）
         try:
-            result = self.ctx.evaluate("""(widgetName) => {
-                try {
-                    // FineReport 提供 _g() 函数访问报表对象
-                    var form = _g();
-                    if (!form || !form.parameterEl) return [];
-                    var widget = form.parameterEl.getWidgetByName(widgetName);
-                    if (!widget) return [];
-                    // combo 控件提供 getItems() 方法
-                    if (typeof widget.getItems === 'function') {
-                        var items = widget.getItems();
-                        return items.map(function(item) {
-                            return item.text || item.value || '';
-                        }).filter(function(t) { return t; });
-                    }
-                    return [];
-                } catch(e) {
-                    return [];
-                }
-            }""", dropdown_label)
+            self._ensure_fr_helper()
+            result = self.ctx.evaluate("n => window.__fr.get(n)",
+                                       dropdown_label)
             if result and len(result) > 0:
                 options = [str(item) for item in result if item]
                 logger.info("通过 FineReport JS API 获取到 %d 个下拉选项", len(options))
@@ -206,49 +575,54 @@ class FilterHandler:
 
         # 方法2：通过 DOM 操作（点击打开下拉列表，读取选项）
         try:
-            # 找到 combo 控件
-            combo = self.ctx.locator(f'div.fr-trigger-editor[widgetname="{dropdown_label}"]').first
-            if not combo or not combo.is_visible():
+            # 找到 combo 控件（ElementHandle 缓存）
+            combo = self._get_fr_widget(dropdown_label)
+            if combo is None or not combo.is_visible():
                 logger.warning("未找到 FineReport combo 控件: %s", dropdown_label)
                 return options
 
             # 点击触发按钮打开下拉列表
-            trigger_btn = combo.locator(".fr-trigger-btn-up, .fr-trigger-btn").first
+            trigger_btn = combo.query_selector(
+                ".fr-trigger-btn-up, .fr-trigger-btn")
             if trigger_btn and trigger_btn.is_visible():
                 trigger_btn.click()
             else:
-                combo.locator("input").first.click()
-            time.sleep(1)
+                combo.query_selector("input").click()
 
-            # 等待下拉列表出现并收集选项
-            # FineReport combo 下拉列表的常见选择器
-            fr_dropdown_selectors = [
-                ".fr-combo-list-item",
-                ".fr-trigger-list .fr-trigger-item",
-                ".fr-list-item",
-                ".x-combo-list-item",
-            ]
+            # 等待下拉列表项出现（事件驱动，列表未出现时最多等 2 秒）
+            try:
+                self.ctx.wait_for_selector(_FR_LIST_ITEM_SEL, timeout=2000)
+            except PlaywrightTimeout:
+                pass
 
-            for sel in fr_dropdown_selectors:
-                try:
-                    items = self.ctx.locator(sel).all()
-                    if items and len(items) > 0:
-                        for item in items:
-                            text = item.text_content().strip()
-                            if text and text not in options:
-                                options.append(text)
-                        if options:
-                            logger.info("通过 DOM 获取到 %d 个 FineReport 下拉选项", len(options))
-                            break
-                except Exception:
-                    continue
+            # 一次 evaluate 完成选择器回退 + 文本提取 + Set 去重：
+            # 按优先级逐个尝试选择器，首个命中的即停
+            # （与原 Python 循环语义一致，但只花 1 次 CDP 往返，
+            # 且不会混入其他家族选择器匹配到的条目）
+            try:
+                texts = self.ctx.evaluate("""(sels) => {
+                    const seen = new Set();
+                    for (const s of sels) {
+                        document.querySelectorAll(s).forEach(el => {
+                            const t = (el.textContent || '').trim();
+                            if (t) seen.add(t);
+                        });
+                        if (seen.size) break;
+                    }
+                    return [...seen];
+                }""", [s.strip() for s in _FR_LIST_ITEM_SEL.split(",")])
+                if texts:
+                    options = [str(t) for t in texts]
+                    logger.info("通过 DOM 获取到 %d 个 FineReport 下拉选项", len(options))
+            except Exception:
+                pass
 
-            # 关闭下拉列表
+            # 关闭下拉列表并等待其收起
             try:
                 self.page.keyboard.press("Escape")
             except Exception:
                 pass
-            time.sleep(0.3)
+            self._wait_hidden(_FR_LIST_ITEM_SEL, timeout=1000)
 
         except Exception as e:
             logger.debug("FineReport DOM 获取下拉选项失败: %s", e)
@@ -265,42 +639,42 @@ class FilterHandler:
             dropdown_label: 下拉框标签/widgetname
             option_text: 要选择的选项文本
         """
-        # 方法1：通过 FineReport JS API 设置值
+        # 方法1：通过 FineReport JS API 设置值（window.__fr 辅助对象）
         try:
-            success = self.ctx.evaluate("""([widgetName, value]) => {
-                try {
-                    var form = _g();
-                    if (!form || !form.parameterEl) return false;
-                    var widget = form.parameterEl.getWidgetByName(widgetName);
-                    if (!widget) return false;
-                    widget.setValue(value);
-                    return true;
-                } catch(e) {
-                    return false;
-                }
-            }""", [dropdown_label, option_text])
+            self._ensure_fr_helper()
+            success = self.ctx.evaluate("([n, v]) => window.__fr.set(n, v)",
+                                        [dropdown_label, option_text])
             if success:
                 logger.info("通过 FineReport JS API 设置下拉值: %s = %s",
                             dropdown_label, option_text)
-                time.sleep(0.5)
+                # 等待控件真正接受该值（替代固定 sleep）
+                try:
+                    self.ctx.wait_for_function("""([widgetName, value]) => {
+                        try {
+                            var w = _g().parameterEl.getWidgetByName(widgetName);
+                            return String(w.getValue()) === String(value);
+                        } catch(e) {
+                            return true;
+                        }
+                    }""", arg=[dropdown_label, option_text], timeout=2000)
+                except Exception:
+                    pass
                 return
         except Exception as e:
             logger.debug("FineReport JS API 设置下拉值失败: %s", e)
 
         # 方法2：通过 DOM 操作（在输入框中直接输入文本）
         try:
-            combo_input = self.ctx.locator(
-                f'div.fr-trigger-editor[widgetname="{dropdown_label}"] '
-                f'input.fr-trigger-texteditor'
-            ).first
+            combo = self._get_fr_widget(dropdown_label)
+            combo_input = (combo.query_selector("input.fr-trigger-texteditor")
+                           if combo is not None else None)
             if combo_input and combo_input.is_visible():
+                # click/fill 自带 actionability 等待，无需 sleep 间隔
                 combo_input.click()
-                time.sleep(0.3)
                 combo_input.fill(option_text)
-                time.sleep(0.5)
-                # 按 Enter 确认选择
+                # 按 Enter 确认选择，并等待下拉列表收起
                 combo_input.press("Enter")
-                time.sleep(0.3)
+                self._wait_hidden(_FR_LIST_ITEM_SEL, timeout=1000)
                 logger.info("通过 DOM 输入设置下拉值: %s = %s",
                             dropdown_label, option_text)
                 return
@@ -309,14 +683,19 @@ class FilterHandler:
 
         # 方法3：通过点击下拉列表中的选项
         try:
-            # 打开下拉列表
-            combo = self.ctx.locator(f'div.fr-trigger-editor[widgetname="{dropdown_label}"]').first
-            trigger_btn = combo.locator(".fr-trigger-btn-up, .fr-trigger-btn").first
+            # 打开下拉列表（复用 ElementHandle 缓存）
+            combo = self._get_fr_widget(dropdown_label)
+            trigger_btn = (combo.query_selector(
+                ".fr-trigger-btn-up, .fr-trigger-btn")
+                if combo is not None else None)
             if trigger_btn and trigger_btn.is_visible():
                 trigger_btn.click()
-            else:
-                combo.locator("input").first.click()
-            time.sleep(1)
+            elif combo is not None:
+                combo.query_selector("input").click()
+            try:
+                self.ctx.wait_for_selector(_FR_LIST_ITEM_SEL, timeout=2000)
+            except PlaywrightTimeout:
+                pass
 
             # 在下拉列表中查找并点击目标选项
             fr_item_selectors = [
@@ -333,7 +712,7 @@ class FilterHandler:
                         text = item.text_content().strip()
                         if text == option_text:
                             item.click()
-                            time.sleep(0.5)
+                            self._wait_hidden(_FR_LIST_ITEM_SEL, timeout=1000)
                             logger.info("通过点击 FineReport 下拉列表选项: %s = %s",
                                         dropdown_label, option_text)
                             return
@@ -362,39 +741,41 @@ class FilterHandler:
         """
         size_str = str(size)
 
-        # 方法1：通过 FineReport JS API
+        # 方法1：通过 FineReport JS API（window.__fr 辅助对象）
         try:
-            success = self.ctx.evaluate("""(value) => {
-                try {
-                    var form = _g();
-                    if (!form || !form.parameterEl) return false;
-                    var widget = form.parameterEl.getWidgetByName('PAGESIZE');
-                    if (!widget) return false;
-                    widget.setValue(value);
-                    return true;
-                } catch(e) {
-                    return false;
-                }
-            }""", size_str)
+            self._ensure_fr_helper()
+            success = self.ctx.evaluate(
+                "v => window.__fr.set('PAGESIZE', v)", size_str)
             if success:
                 logger.info("通过 FineReport JS API 设置每页条数: %d", size)
                 return
         except Exception as e:
             logger.debug("FineReport JS API 设置每页条数失败: %s", e)
 
-        # 方法2：通过 DOM 直接修改 PAGESIZE 输入框
+        # 方法2：通过 DOM 直接修改 PAGESIZE 输入框（复用 ElementHandle 缓存）
         try:
-            pagesize_input = self.ctx.locator(
-                'div.fr-trigger-editor[widgetname="PAGESIZE"] input.fr-trigger-texteditor, '
-                'div[widgetname="PAGESIZE"] input'
-            ).first
+            combo = self._get_fr_widget("PAGESIZE")
+            if combo is not None:
+                pagesize_input = combo.query_selector(
+                    "input.fr-trigger-texteditor, input")
+            else:
+                pagesize_input = self.ctx.locator(
+                    'div[widgetname="PAGESIZE"] input').first
             if pagesize_input and pagesize_input.is_visible():
                 pagesize_input.click()
-                time.sleep(0.3)
                 pagesize_input.fill(size_str)
-                time.sleep(0.3)
                 pagesize_input.press("Enter")
-                time.sleep(0.5)
+                # 等待输入框值生效（替代固定 sleep）
+                try:
+                    handle = (pagesize_input.element_handle()
+                              if hasattr(pagesize_input, "element_handle")
+                              else pagesize_input)
+                    self.ctx.wait_for_function(
+                        "([el, v]) => el.value === v",
+                        arg=[handle, size_str], timeout=1000,
+                    )
+                except Exception:
+                    pass
                 logger.info("通过 DOM 设置 FineReport 每页条数: %d", size)
                 return
         except Exception as e:
@@ -406,180 +787,227 @@ class FilterHandler:
         """
         设置日期输入框（格式：YYYY-MM-DD）
 
-        适配多种页面类型：
-        - Element UI DatePicker 页面（如：实时节点边际电价等）
-        - FineReport 报表页面（如：抽蓄电站水位、日前备用总量等）
-        - 普通文本输入框页面
+        按页面类型分流（检测结果有缓存，见 _is_finereport_page）：
+        - FineReport 报表页面走 _set_date_fr（widgetname 定位 + JS 赋值）
+        - 其他页面走 _set_date_el（Element UI DatePicker / 通用输入框）
 
-        FineReport 页面特征：
-        - 日期控件使用 .fr-trigger-editor[widgetname="日期"]
-        - 输入框使用 input.fr-trigger-texteditor
-        - 支持直接文本输入日期（directEdit: true）
+        原先 5 个策略串行探测，FineReport 页面也要先空跑
+        Element UI 选择器（反之亦然）；分流后各自只做必要的查找。
 
         Args:
             date_str: 目标日期（YYYY-MM-DD）
         """
         logger.info("设置日期: %s", date_str)
+        if not _DATE_RE.match(date_str):
+            logger.warning("日期格式异常（期望 YYYY-MM-DD）: %s", date_str)
         try:
             self._wait_for_filters_ready()
+            if self._is_finereport_page():
+                self._set_date_fr(date_str)
+            else:
+                self._set_date_el(date_str)
+            # 筛选条件已变化，作废下拉选项缓存
+            self._dd_cache.clear()
+            logger.info("日期已设置为: %s", date_str)
+        except Exception as e:
+            logger.error("设置日期失败 [%s]: %s", date_str, e)
+            raise
 
-            date_input = None
-
-            # 策略1：FineReport 报表 - 通过 widgetname 属性精确定位
-            if date_input is None:
-                date_input = self._pick_visible_input(
-                    self.ctx,
-                    [
-                        'div.fr-trigger-editor[widgetname="日期"] input.fr-trigger-texteditor',
-                        'div[widgetname="日期"] input.fr-trigger-texteditor',
-                        'div[widgetname="日期"] input',
-                        "input.fr-trigger-texteditor",
-                    ],
-                )
-                if date_input is not None:
-                    logger.debug("通过 FineReport widgetname 找到日期输入框")
-
-            # 策略2：通过"日期"标签定位其旁边的日期输入框（Element UI）
-            if date_input is None:
-                form_item = self._find_form_item("日期")
-                if form_item is not None:
-                    date_input = self._pick_visible_input(
-                        form_item,
-                        [
-                            ".el-date-editor input",
-                            ".el-date-editor .el-input__inner",
-                            'input[placeholder*="日期"]',
-                            'input[placeholder*="date"]',
-                            ".el-input__inner",
-                            "input",
-                        ],
-                    )
-
-            # 策略3：全局查找 Element UI 日期控件
-            if date_input is None:
-                date_input = self._pick_visible_input(
-                    self.ctx,
-                    [
-                        ".el-date-editor input",
-                        ".el-date-editor .el-input__inner",
-                        'input[placeholder*="日期"]',
-                        'input[placeholder*="date"]',
-                        'input[type="date"]',
-                    ],
-                )
+    def _set_date_fr(self, date_str: str):
+        """
+        FineReport 页面的日期设置。
 
-            # 策略4：通过标签文本查找附近的 input（适配非 Element UI 页面）
-            if date_input is None:
-                for label_text in ["日期", "运行日期", "查询日期", "选择日期", "日"]:
-                    try:
-                        label_el = self.ctx.locator(f"text={label_text}").first
-                        if label_el and label_el.is_visible():
-                            # 向上遍历父级，查找附近的 input
-                            for level in range(1, 6):
-                                ancestor = label_el
-                                for _ in range(level):
-                                    ancestor = ancestor.locator("..")
-                                try:
-                                    inp = ancestor.locator("input").first
-                                    if inp and inp.is_visible():
-                                        date_input = inp
-                                        logger.debug(
-                                            "通过标签「%s」+ 父级(level=%d)找到日期输入框",
-                                            label_text, level,
-                                        )
-                                        break
-                                except Exception:
-                                    continue
-                            if date_input is not None:
-                                break
-                    except Exception:
-                        continue
-
-            # 策略5：查找值包含日期格式的 input（当前页面已有日期值）
-            if date_input is None:
-                try:
-                    inputs = self.ctx.locator("input").all()
-                    for inp in inputs:
-                        try:
-                            if inp.is_visible():
-                                val = inp.input_value().strip()
-                                # 检查值是否类似日期格式 YYYY-MM-DD
-                                if val and len(val) == 10 and val[4] == "-" and val[7] == "-":
-                                    date_input = inp
-                                    logger.debug("通过已有日期值找到日期输入框: %s", val)
-                                    break
-                        except Exception:
-                            continue
-                except Exception:
-                    pass
+        快路径一次 evaluate 完成定位+赋值+事件派发，返回值即校验结果
+        （FineReport texteditor 对 JS 赋值稳定生效，directEdit: true）；
+        未命中控件时回退到 widgetname 选择器 + 通用键入流程。
+        """
+        try:
+            value = self.ctx.evaluate("""(val) => {
+                const el = document.querySelector(
+                    'div.fr-trigger-editor[widgetname="日期"]'
+                    + ' input.fr-trigger-texteditor, '
+                    + 'div[widgetname="日期"] input, '
+                    + 'input.fr-trigger-texteditor');
+                if (!el) return null;
+                el.focus();
+                el.value = val;
+                el.dispatchEvent(new Event('input', {bubbles: true}));
+                el.dispatchEvent(new Event('change', {bubbles: true}));
+                el.dispatchEvent(new KeyboardEvent('keydown',
+                    {key: 'Enter', bubbles: true}));
+                el.blur();
+                return el.value;
+            }""", date_str)
+            if value == date_str:
+                logger.debug("FineReport JS 快路径设置日期成功")
+                return
+            # 未命中控件或值未被接受，回退到通用键入流程
+        except Exception as e:
+            logger.debug("FineReport JS 设置日期失败: %s", e)
 
-            if date_input is None:
-                # 输出调试信息帮助定位问题
-                try:
-                    input_count = self.ctx.locator("input").count()
-                    fr_count = self.ctx.locator(".fr-trigger-editor").count()
-                    el_count = self.ctx.locator(".el-date-editor").count()
-                    logger.error(
-                        "未找到日期输入框 - 页面控件统计: "
-                        "input=%d, fr-trigger-editor=%d, el-date-editor=%d",
-                        input_count, fr_count, el_count,
-                    )
-                except Exception:
-                    pass
-                raise RuntimeError("未找到日期输入框")
+        date_input = self._pick_visible_input(
+            self.ctx, list(_FR_DATE_SELECTORS))
+        if date_input is None:
+            self._log_date_debug_snapshot()
+            raise RuntimeError("未找到日期输入框")
+        self._fill_date_input(date_input, date_str)
 
-            # 点击日期输入框
-            date_input.click()
-            time.sleep(0.5)
+    def _set_date_el(self, date_str: str):
+        """Element UI / 通用页面的日期设置（多策略查找输入框后键入）"""
+        date_input = None
 
-            # 三次全选已有内容（用 Ctrl+A 和 Meta+A 兼容 macOS/Windows）
-            date_input.press("Control+a")
-            time.sleep(0.1)
-            date_input.fill(date_str)
-            time.sleep(0.3)
+        # 策略1：联合选择器一次解析（全局 Element UI 日期控件，
+        # 每段带 :visible 伪类，替代逐选择器探测的多次往返）
+        try:
+            cand = self.ctx.locator(_EL_DATE_INPUT_SEL).first
+            cand.wait_for(state="visible", timeout=2000)
+            date_input = cand
+            logger.debug("通过联合选择器找到日期输入框")
+        except Exception:
+            pass
 
-            # 验证输入值，如果 fill 不生效则用 JS 直接赋值
+        # 策略2：通过"日期"标签定位其旁边的日期输入框
+        if date_input is None:
+            form_item = self._find_form_item("日期")
+            if form_item is not None:
+                date_input = self._pick_visible_input(
+                    form_item, list(_DATE_INPUT_SELECTORS))
+
+        # 策略3+4：一次 evaluate 在页面内完成两轮查找——先按标签文本
+        # 逐级向上找最近的可见 input（适配非 Element UI 页面），
+        # 再兜底扫描值形如 YYYY-MM-DD 的输入框；返回命中 input 在
+        # document 中的序号。原先"每标签一条 XPath + 全输入框扫描"的
+        # 多次往返合并为 1 次
+        if date_input is None:
             try:
-                current = date_input.input_value().strip()
-                if current != date_str:
-                    logger.debug("fill 输入未生效 (%s)，使用 JS 赋值", current)
-                    self.ctx.evaluate(
-                        """([el, val]) => {
-                            el.value = val;
-                            el.dispatchEvent(new Event('input', { bubbles: true }));
-                            el.dispatchEvent(new Event('change', { bubbles: true }));
-                        }""",
-                        [date_input.element_handle(), date_str],
-                    )
+                idx = self.ctx.evaluate("""(labels) => {
+                    const inputs = [...document.querySelectorAll('input')];
+                    const visible = el => el.offsetParent !== null
+                        && el.type !== 'hidden';
+                    for (const lbl of labels) {
+                        const hit = document.evaluate(
+                            `//*[contains(normalize-space(.), '${lbl}')]`,
+                            document, null,
+                            XPathResult.FIRST_ORDERED_NODE_TYPE,
+                            null).singleNodeValue;
+                        if (!hit) continue;
+                        let a = hit;
+                        for (let l = 0; l < 5 && a; l++) {
+                            const inp = [...a.querySelectorAll('input')]
+                                .find(visible);
+                            if (inp) return inputs.indexOf(inp);
+                            a = a.parentElement;
+                        }
+                    }
+                    return inputs.findIndex(el => visible(el) &&
+                        /^\\d{4}-\\d{2}-\\d{2}$/.test(
+                            (el.value || '').trim()));
+                }""", list(_DATE_LABELS))
+                if idx is not None and idx >= 0:
+                    date_input = self.ctx.locator("input").nth(idx)
+                    logger.debug("通过页面内单次扫描找到日期输入框")
             except Exception:
                 pass
 
-            # 按 Tab 确认输入（FineReport 的日期控件响应 Tab/Enter 事件来确认值）
+        if date_input is None:
+            self._log_date_debug_snapshot()
+            raise RuntimeError("未找到日期输入框")
+        self._fill_date_input(date_input, date_str)
+
+    def _fill_date_input(self, date_input, date_str: str):
+        """向已定位的日期输入框键入日期并确认（两类页面共用）"""
+        # 先把 Locator 固化为 ElementHandle：后续 click / press / fill /
+        # 校验 / 清理都复用同一引用，免去每步操作各自重新解析选择器
+        try:
+            handle = date_input.element_handle(timeout=2000)
+        except Exception:
+            handle = None
+        target = handle if handle is not None else date_input
+
+        # 点击并填入日期（click/fill 自带 actionability 等待）
+        target.click()
+        target.press("Control+a")
+        target.fill(date_str)
+
+        # 等待输入值生效，超时说明 fill 未被控件接受，改用 JS 直接赋值
+        try:
+            if handle is None:
+                handle = date_input.element_handle()
+            self.ctx.wait_for_function(
+                "([el, val]) => el.value === val",
+                arg=[handle, date_str], timeout=1500,
+            )
+        except Exception:
+            logger.debug("fill 输入未生效，使用 JS 赋值")
             try:
-                date_input.press("Tab")
+                # init script 注入的辅助函数缺失时（如外部创建的页面）
+                # 现场补一份再调用
+                self.ctx.evaluate(
+                    "([el, val]) => {"
+                    f" {_SET_INPUT_VALUE_JS} "
+                    "window.__setInputValue(el, val); }",
+                    [handle if handle is not None
+                     else date_input.element_handle(), date_str],
+                )
             except Exception:
                 pass
-            time.sleep(0.3)
 
-            # 按 Escape 关闭日期面板（如果还在显示）
+        # 确认输入并关闭日期面板：Tab 确认、blur、焦点移回 body 在
+        # 一次 evaluate 内完成；Escape 只在日期面板确实还开着时才派发，
+        # 常态（fill 后面板已自行收起）直接跳过关闭与等待
+        try:
+            panel_open = self.ctx.evaluate("""(el) => {
+                el.dispatchEvent(new KeyboardEvent('keydown',
+                    {key: 'Tab', bubbles: true}));
+                el.blur();
+                if (document.body) document.body.focus();
+                const open = !!document.querySelector(
+                    '.el-picker-panel:not([style*="display: none"]), '
+                    + '.el-date-picker:not([style*="display: none"])');
+                if (open) {
+                    document.dispatchEvent(new KeyboardEvent('keydown',
+                        {key: 'Escape', bubbles: true}));
+                }
+                return open;
+            }""", handle if handle is not None
+                else date_input.element_handle())
+        except Exception:
+            # 兜底：退回真实键盘操作
+            panel_open = True
             try:
+                target.press("Tab")
                 self.page.keyboard.press("Escape")
             except Exception:
                 pass
-            time.sleep(0.5)
 
-            # 点击页面空白处确保日期面板关闭
-            try:
-                self.ctx.locator("body").click(position={"x": 0, "y": 0})
-            except Exception:
-                pass
-            time.sleep(0.3)
+        # 等待日期面板收起（仅当确实有面板开着）
+        if panel_open:
+            self._wait_hidden(".el-picker-panel, .el-date-picker",
+                              timeout=1000)
 
-            logger.info("日期已设置为: %s", date_str)
+    def _log_date_debug_snapshot(self):
+        """
+        输出页面控件统计，帮助定位日期输入框缺失问题。
 
-        except Exception as e:
-            logger.error("设置日期失败 [%s]: %s", date_str, e)
-            raise
+        统计本身要发 CDP 请求，只在 DEBUG 级别启用时才执行；
+        三类控件计数合并为一次 evaluate。
+        """
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        try:
+            counts = self.ctx.evaluate(
+                "() => ({"
+                "i: document.querySelectorAll('input').length, "
+                "f: document.querySelectorAll('.fr-trigger-editor').length, "
+                "e: document.querySelectorAll('.el-date-editor').length})"
+            )
+            logger.debug(
+                "未找到日期输入框 - 页面控件统计: "
+                "input=%d, fr-trigger-editor=%d, el-date-editor=%d",
+                counts["i"], counts["f"], counts["e"],
+            )
+        except Exception:
+            pass
 
     def _find_active_dropdown_panel(self):
         """
@@ -589,17 +1017,17 @@ class FilterHandler:
         页面上可能存在多个面板（如节点名称下拉、分页条数下拉等），
         但同一时刻只有一个是可见的（正在展开的那个）。
 
+        使用 :visible 伪类让可见性过滤在页面内一次完成，
+        替代 .all() + 逐面板 is_visible() 的 O(N) 次往返
+        （页面常驻多个隐藏面板时差距明显）。
+
         Returns:
             可见的下拉面板 Locator，未找到返回 None
         """
         try:
-            panels = self.ctx.locator(".el-select-dropdown.el-popper").all()
-            for panel in panels:
-                try:
-                    if panel.is_visible():
-                        return panel
-                except Exception:
-                    continue
+            panel = self.ctx.locator(f"{_EL_PANEL_SEL}:visible").first
+            if panel.count() > 0:
+                return panel
         except Exception:
             pass
         return None
@@ -625,52 +1053,26 @@ class FilterHandler:
         if dropdown is None:
             raise RuntimeError(f"未找到下拉框: {dropdown_label}")
 
-        # 先关闭可能已打开的面板
+        # 仅当确实有面板残留时才关闭并等待收起；常态（无残留面板）
+        # 一次 evaluate 判定后直接跳过 Escape+等待
         try:
-            self.page.keyboard.press("Escape")
-            time.sleep(0.5)
+            panel_open = self.ctx.evaluate(f"() => {_EL_PANEL_VISIBLE_JS}")
         except Exception:
-            pass
-
-        # 确保所有面板都已关闭
-        for _ in range(5):
-            if self._find_active_dropdown_panel() is None:
-                break
-            time.sleep(0.3)
+            panel_open = True
+        if panel_open:
+            try:
+                self.page.keyboard.press("Escape")
+            except Exception:
+                pass
+            self._wait_hidden(_EL_PANEL_SEL, timeout=2000)
 
-        # 点击打开下拉面板
+        # 点击打开下拉面板，一次 wait_for_function 等到
+        # "面板可见且已渲染出选项"（替代点击-睡眠-重点的手动轮询）
         dropdown.click()
-        time.sleep(0.8)
-
-        # 等待目标下拉面板出现（通过检测可见面板）
-        panel = None
-        for attempt in range(3):
-            # 检查是否有面板变为可见
-            panel = self._find_active_dropdown_panel()
-            if panel:
-                # 确认面板中有选项
-                try:
-                    item_count = panel.locator(".el-select-dropdown__item").count()
-                    if item_count > 0:
-                        logger.debug("下拉面板已出现，包含 %d 个选项", item_count)
-                        break
-                except Exception:
-                    pass
+        panel_ready = self._wait_panel_ready(timeout=3000)
 
-            if attempt < 2:
-                # 重试：再次点击下拉框
-                logger.debug("下拉面板未出现，重试点击... (第%d次)", attempt + 2)
-                try:
-                    # 先关闭可能打开的其他面板
-                    self.page.keyboard.press("Escape")
-                    time.sleep(0.3)
-                except Exception:
-                    pass
-                dropdown.click()
-                time.sleep(1.5)
-
-        if panel is None or not panel.is_visible():
-            logger.warning("下拉面板仍未出现，尝试使用 JavaScript 触发")
+        if not panel_ready:
+            logger.warning("下拉面板未出现，尝试使用 JavaScript 触发")
             # 最后手段：通过 JS 点击 el-select 容器触发展开
             try:
                 self.ctx.evaluate("""(inputEl) => {
@@ -684,23 +1086,40 @@ class FilterHandler:
                         }
                     }
                 }""", dropdown.element_handle())
-                time.sleep(1.5)
-                panel = self._find_active_dropdown_panel()
+                panel_ready = self._wait_panel_ready(timeout=3000)
             except Exception as e:
                 logger.debug("JS 触发下拉面板失败: %s", e)
 
-        if panel is None:
+        if not panel_ready:
             logger.warning("下拉面板最终未能打开")
+        else:
+            # 面板展开带 el-zoom 过渡动画，等动画结束再操作选项，
+            # 避免点击命中仍在位移中的列表项
+            self._wait_for_animation_end()
 
         return dropdown
 
+    def _wait_for_animation_end(self, timeout: int = 1000):
+        """等待页面上所有进行中的 CSS 动画/过渡结束（超时即放行）"""
+        try:
+            self.ctx.evaluate(
+                """(ms) => Promise.race([
+                    Promise.all(document.getAnimations()
+                        .map(a => a.finished.catch(() => null))),
+                    new Promise(r => setTimeout(r, ms)),
+                ])""",
+                timeout,
+            )
+        except Exception as e:
+            logger.debug("等待动画结束失败: %s", e)
+
     def _close_dropdown_panel(self):
-        """关闭当前打开的下拉面板"""
+        """关闭当前打开的下拉面板并等待其收起"""
         try:
             self.page.keyboard.press("Escape")
         except Exception:
             pass
-        time.sleep(0.3)
+        self._wait_hidden(_EL_PANEL_SEL, timeout=1000)
 
     def _collect_visible_dropdown_items(self) -> List[str]:
         """
@@ -717,36 +1136,56 @@ class FilterHandler:
         """
         options = []
         try:
-            # 关键修复：仅从当前打开的可见面板中收集选项
-            panel = self._find_active_dropdown_panel()
-            if panel is None:
+            # 整个提取过程在页面内一次 evaluate 完成：定位可见面板、
+            # 读取每项文本（优先 span 子元素）、Set 去重并过滤"全部"。
+            # 相比 .all() + 逐项 text_content()，200 项下拉从 200 次
+            # CDP 往返降为 1 次
+            texts = self.ctx.evaluate("""() => {
+                const panels = [...document.querySelectorAll(
+                    '.el-select-dropdown.el-popper')];
+                const panel = panels.find(p => p.offsetParent !== null);
+                if (!panel) return null;
+                const seen = new Set();
+                for (const li of panel.querySelectorAll(
+                        '.el-select-dropdown__item')) {
+                    const s = li.querySelector('span');
+                    const t = ((s ? s.textContent : li.textContent) || '').trim();
+                    if (t && t !== '全部') seen.add(t);
+                }
+                return [...seen];
+            }""")
+            if texts is None:
                 logger.warning("未找到可见的下拉面板，无法收集选项")
                 return options
-
-            # 优先取 span 内文本（更精确），回退到 li 自身文本
-            items = panel.locator(".el-select-dropdown__item").all()
-            for item in items:
-                try:
-                    # 优先读 span 子元素的文本
-                    span = item.locator("span").first
-                    text = ""
-                    try:
-                        text = span.text_content().strip()
-                    except Exception:
-                        text = item.text_content().strip()
-                    if text and text != "全部" and text not in options:
-                        options.append(text)
-                except Exception:
-                    continue
+            options = [str(t) for t in texts]
         except Exception as e:
             logger.debug("收集下拉选项失败: %s", e)
         return options
 
+    def _dd_cache_key(self) -> str:
+        """
+        当前筛选状态的简易键（页面上日期输入框的值）。
+
+        下拉选项通常只随日期等筛选条件变化；
+        日期不变时重复调用 get_dropdown_options 可直接复用上次结果。
+        """
+        try:
+            return str(self.ctx.evaluate(
+                "() => { const el = document.querySelector("
+                "'input.fr-trigger-texteditor, .el-date-editor input, "
+                "input[type=\"date\"]');"
+                " return el ? el.value : ''; }"
+            ))
+        except Exception:
+            return ""
+
     def get_dropdown_options(self, dropdown_label: str) -> List[str]:
         """
         获取指定下拉框的所有选项
 
         自动检测页面类型（FineReport / Element UI），使用对应的策略。
+        结果按（标签, 筛选状态）缓存，筛选条件未变的重复调用直接命中；
+        set_date / select_dropdown_option 会使缓存失效。
 
         Args:
             dropdown_label: 下拉框标签（如：节点名称、断面名称、机组名称等）
@@ -754,6 +1193,13 @@ class FilterHandler:
         Returns:
             选项文本列表
         """
+        cache_key = (dropdown_label, self._dd_cache_key())
+        cached = self._dd_cache.get(cache_key)
+        if cached is not None:
+            logger.info("命中下拉选项缓存 [%s]: 共 %d 个",
+                        dropdown_label, len(cached))
+            return list(cached)
+
         logger.info("获取下拉选项: %s", dropdown_label)
         options = []
 
@@ -780,6 +1226,7 @@ class FilterHandler:
                 logger.info("  前5个: %s%s",
                             options[:5],
                             " ..." if len(options) > 5 else "")
+                self._dd_cache[cache_key] = list(options)
 
         except Exception as e:
             logger.error("获取下拉选项失败 [%s]: %s", dropdown_label, e)
@@ -801,6 +1248,8 @@ class FilterHandler:
             option_text: 要选择的选项文本
         """
         logger.info("选择下拉选项: %s = %s", dropdown_label, option_text)
+        # 选中的值可能影响其他联动下拉的选项，作废下拉选项缓存
+        self._dd_cache.clear()
         try:
             self._wait_for_filters_ready()
 
@@ -822,6 +1271,58 @@ class FilterHandler:
                 pass
             raise
 
+    def pick_from_dropdown(self, dropdown_label: str, chooser) -> Optional[str]:
+        """
+        一次打开面板内完成"列出选项 + 按策略挑选 + 点击"。
+
+        调用方惯用的 get_dropdown_options + select_dropdown_option
+        组合要付两轮完整的开面板-收集-关面板；此方法只开一次面板，
+        同时避免两次调用之间选项集合变化的竞态。
+
+        Args:
+            dropdown_label: 下拉框标签
+            chooser: 回调，接收选项文本列表，返回要选择的下标
+                     （返回越界/负数表示不选）
+
+        Returns:
+            实际选中的选项文本，未选择返回 None
+        """
+        logger.info("挑选下拉选项: %s", dropdown_label)
+        self._wait_for_filters_ready()
+
+        # FineReport 页面：JS API 取选项列表本来就不开面板，直接组合
+        if self._is_finereport_page():
+            options = self._fr_get_dropdown_options(dropdown_label)
+            idx = chooser(options) if options else -1
+            if idx is None or not 0 <= idx < len(options):
+                return None
+            self._fr_select_dropdown_option(dropdown_label, options[idx])
+            self._dd_cache.clear()
+            return options[idx]
+
+        # Element UI 页面：开一次面板，收集后就地点击选中项
+        try:
+            self._open_dropdown_panel(dropdown_label)
+            options = self._collect_visible_dropdown_items()
+            idx = chooser(options) if options else -1
+            if idx is None or not 0 <= idx < len(options):
+                self._close_dropdown_panel()
+                return None
+            if self._click_option_in_panel(options[idx]) != 'ok':
+                self._close_dropdown_panel()
+                raise RuntimeError(f"未在下拉选项中找到: {options[idx]}")
+            self._wait_hidden(_EL_PANEL_SEL, timeout=2000)
+            self._dd_cache.clear()
+            logger.info("已选择: %s = %s", dropdown_label, options[idx])
+            return options[idx]
+        except Exception as e:
+            logger.error("挑选下拉选项失败 [%s]: %s", dropdown_label, e)
+            try:
+                self._close_dropdown_panel()
+            except Exception:
+                pass
+            raise
+
     def _el_select_dropdown_option(self, dropdown_label: str, option_text: str):
         """
         Element UI 页面的下拉选项选择逻辑。
@@ -838,9 +1339,8 @@ class FilterHandler:
             dropdown_label: 下拉框标签
             option_text: 要选择的选项文本
         """
-        # 打开下拉面板
+        # 打开下拉面板（内部已等待面板可见）
         self._open_dropdown_panel(dropdown_label)
-        time.sleep(0.3)
 
         # 关键：找到当前打开的面板，仅在其中查找选项
         panel = self._find_active_dropdown_panel()
@@ -852,59 +1352,57 @@ class FilterHandler:
 
         # 在面板中查找目标选项并点击
         option_found = False
+        cache_key = (dropdown_label, option_text)
 
-        # 策略1：精确匹配 el-select-dropdown__item（限定在当前面板内）
-        try:
-            items = panel.locator(".el-select-dropdown__item").all()
-            for item in items:
-                try:
-                    text = item.text_content().strip()
-                    if text == option_text:
-                        # 滚动到可见区域
-                        item.scroll_into_view_if_needed()
-                        time.sleep(0.2)
-                        item.click()
-                        option_found = True
-                        logger.debug("通过精确匹配点击选项: %s", option_text)
-                        break
-                except Exception:
-                    continue
-        except Exception as e:
-            logger.debug("策略1查找选项失败: %s", e)
-
-        # 策略2：通过 span 子元素的文本精确匹配（限定在当前面板内）
+        # 缓存命中：此前成功定位过的选项直接点击，跳过查找策略
+        cached = self._option_cache.get(cache_key)
+        if cached is not None:
+            try:
+                cached.click(timeout=2000)
+                option_found = True
+                logger.debug("通过缓存 Locator 点击选项: %s", option_text)
+            except Exception:
+                self._option_cache.pop(cache_key, None)
+
+        # 策略0：一次 evaluate 在页面内完成查找+滚动+点击
+        if not option_found and self._click_option_in_panel(option_text) == 'ok':
+            option_found = True
+            logger.debug("通过 JS 一次调用点击选项: %s", option_text)
+            # JS 路径不产生 Locator，缓存等效的精确匹配选择器供下次复用
+            self._option_cache[cache_key] = panel.locator(
+                _option_exact_sel(option_text)).first
+
+        # 策略1：:text-is() 精确文本匹配，由 Playwright 选择器引擎
+        # 在页面内一次完成（限定在当前面板内）。
+        # 替代 .all() + 逐项 text_content() 比对的 O(N) 次往返，
+        # 同时覆盖选项文本在 li 或其 span 子元素内两种结构
         if not option_found:
             try:
-                items = panel.locator(
-                    ".el-select-dropdown__item span"
-                ).all()
-                for item in items:
-                    try:
-                        text = item.text_content().strip()
-                        if text == option_text:
-                            parent = item.locator("..")
-                            parent.scroll_into_view_if_needed()
-                            time.sleep(0.2)
-                            parent.click()
-                            option_found = True
-                            logger.debug("通过span子元素点击选项: %s", option_text)
-                            break
-                    except Exception:
-                        continue
+                target = panel.locator(_option_exact_sel(option_text)).first
+                # count() 一次廉价往返即可排除不存在的选项，
+                # 避免 click 在缺失元素上空等整个超时
+                if target.count() > 0:
+                    target.click(timeout=2000)
+                    option_found = True
+                    self._option_cache[cache_key] = target
+                    logger.debug("通过 text-is 精确匹配点击选项: %s", option_text)
             except Exception as e:
-                logger.debug("策略2查找选项失败: %s", e)
+                logger.debug("策略1查找选项失败: %s", e)
 
-        # 策略3：使用 has-text 精确文本匹配（限定在当前面板内）
+        # 策略2：使用 has-text 包含匹配兜底（限定在当前面板内）
         if not option_found:
             try:
-                target = panel.locator(
-                    f'.el-select-dropdown__item:has-text("{option_text}")'
-                ).first
-                if target.is_visible():
-                    target.scroll_into_view_if_needed()
-                    time.sleep(0.2)
-                    target.click()
+                target = panel.locator(_option_fuzzy_sel(option_text)).first
+                if target.count() > 0 and target.is_visible():
+                    # click 自带的 actionability 检查已包含滚动到可见，
+                    # 仅在其超时时才显式滚动重试
+                    try:
+                        target.click(timeout=3000)
+                    except PlaywrightTimeout:
+                        target.scroll_into_view_if_needed()
+                        target.click()
                     option_found = True
+                    self._option_cache[cache_key] = target
                     logger.debug("通过has-text点击选项: %s", option_text)
             except Exception as e:
                 logger.debug("策略3查找选项失败: %s", e)
@@ -914,10 +1412,70 @@ class FilterHandler:
             raise RuntimeError(f"未在下拉选项中找到: {option_text}")
 
         # 等待下拉面板自动关闭（el-select 选中后自动收起）
-        time.sleep(0.5)
+        self._wait_hidden(_EL_PANEL_SEL, timeout=2000)
 
         logger.info("已选择: %s = %s", dropdown_label, option_text)
 
+    def _click_option_in_panel(self, option_text: str) -> str:
+        """
+        在当前可见下拉面板中查找并点击指定选项（一次 evaluate 完成）。
+
+        查找、scrollIntoView、click 全部在页面内执行，
+        替代 Python 侧逐项 text_content() + scroll + click 的
+        每候选 3 次 CDP 往返。
+
+        Args:
+            option_text: 选项文本（精确匹配，优先 span 子元素文本）
+
+        Returns:
+            'ok' 点击成功；'not-found' 面板中无此项；'no-panel' 无可见面板
+        """
+        try:
+            return self.ctx.evaluate("""(target) => {
+                const panels = [...document.querySelectorAll(
+                    '.el-select-dropdown.el-popper')];
+                const panel = panels.find(p => p.offsetParent !== null);
+                if (!panel) return 'no-panel';
+                const items = [...panel.querySelectorAll(
+                    '.el-select-dropdown__item')];
+                const hit = items.find(li => {
+                    const s = li.querySelector('span');
+                    return (((s ? s.textContent : li.textContent) || '')
+                            .trim()) === target;
+                });
+                if (!hit) return 'not-found';
+                hit.scrollIntoView({block: 'center'});
+                hit.click();
+                return 'ok';
+            }""", option_text)
+        except Exception as e:
+            logger.debug("JS 点击下拉选项失败: %s", e)
+            return 'not-found'
+
+    def _probe(self, spec: dict) -> dict:
+        """
+        批量探测一组选择器（{键: 选择器} -> {键: 是否存在可见匹配}）。
+
+        多个独立的 is_visible() 探测各自走一次 CDP 往返，协议开销
+        往往超过 DOM 查询本身；合并成一次 evaluate 在浏览器端完成
+        全部查找，Python 侧只剩本地分支。探测失败时返回全 False，
+        调用方按未命中处理，自行走各自的回退路径。
+        """
+        try:
+            return self.ctx.evaluate("""(spec) => {
+                const out = {};
+                for (const [key, sel] of Object.entries(spec)) {
+                    try {
+                        const el = document.querySelector(sel);
+                        out[key] = !!el && el.offsetParent !== null;
+                    } catch (e) { out[key] = false; }
+                }
+                return out;
+            }""", spec)
+        except Exception as e:
+            logger.debug("批量选择器探测失败: %s", e)
+            return {key: False for key in spec}
+
     def set_page_size(self, size: int = 50):
         """
         设置每页显示条数
@@ -935,40 +1493,61 @@ class FilterHandler:
                 self._fr_set_page_size(size)
                 return
 
-            # Element UI 路径
-            page_size_selectors = [
-                "text=每页条数",
-                "text=每页展示",
-                ".el-pagination .el-select",
-            ]
+            # Element UI 路径：先批量探测一次，直接命中分页下拉时
+            # 跳过逐选择器 is_visible 探测
+            hits = self._probe({
+                "sizes": ".el-pagination__sizes .el-select",
+                "pagination": ".el-pagination .el-select",
+            })
+            if hits.get("sizes"):
+                page_size_selectors = (".el-pagination__sizes .el-select",)
+            elif hits.get("pagination"):
+                page_size_selectors = (".el-pagination .el-select",)
+            else:
+                page_size_selectors = self._PAGE_SIZE_SELECTORS
+
+            # 上次命中的选择器排到最前（同一站点稳定走同一条）
+            winner = self._winning_selectors.get("page_size")
+            if winner and winner in page_size_selectors:
+                page_size_selectors = (winner,) + tuple(
+                    s for s in page_size_selectors if s != winner)
 
             for sel in page_size_selectors:
                 try:
                     element = self.ctx.locator(sel).first
-                    if element.is_visible():
+                    if element.count() > 0 and element.is_visible():
                         # 找到后点击旁边的下拉框
                         dropdown = element.locator(".. >> select, .. >> .el-input__inner").first
                         dropdown.click()
-                        time.sleep(0.5)
+                        self._wait_panel_visible(timeout=2000)
 
-                        # 选择目标条数
+                        # 选择目标条数，并等待面板收起
                         self.ctx.locator(f"text={size}").first.click()
-                        time.sleep(1)
+                        self._wait_hidden(_EL_PANEL_SEL, timeout=2000)
+                        self._winning_selectors["page_size"] = sel
                         logger.info("已设置每页 %d 条", size)
                         return
                 except Exception:
                     continue
 
-            # 回退方案：直接查找带条数的 select
-            selects = self.ctx.locator("select").all()
-            for sel in selects:
-                opts = sel.locator("option").all()
-                for opt in opts:
-                    if str(size) in opt.text_content():
-                        sel.select_option(str(size))
-                        time.sleep(1)
-                        logger.info("已设置每页 %d 条", size)
-                        return
+            # 回退方案：一次 evaluate 在浏览器端扫描所有 select/option，
+            # 替代逐 select 逐 option 的 all()/text_content() 往返
+            matched = self.ctx.evaluate("""(size) => {
+                for (const s of document.querySelectorAll('select')) {
+                    for (const o of s.options) {
+                        if ((o.textContent || '').includes(String(size))) {
+                            s.value = o.value;
+                            s.dispatchEvent(
+                                new Event('change', {bubbles: true}));
+                            return true;
+                        }
+                    }
+                }
+                return false;
+            }""", size)
+            if matched:
+                logger.info("已设置每页 %d 条", size)
+                return
 
             logger.warning("未找到每页条数选择器")
 
@@ -985,35 +1564,15 @@ class FilterHandler:
         """
         logger.info("点击「查询」按钮")
         try:
-            query_selectors = [
-                # FineReport 查询按钮
-                # widgetname 属性以 "SEARCH" 开头（实际有 SEARCH, SEARCH_C, SEARCH_C_C 等变体）
-                'div[widgetname^="SEARCH"]',
-                'div.fr-form-imgboard:has-text("查询")',
-                'div.fr-form-imgboard:has-text("查 询")',
-                # Element UI 查询按钮
-                'button:has-text("查询")',
-                'button:has-text("查 询")',
-                # 通用匹配
-                "text=查询",
-                ".query-btn",
-                'button[type="primary"]',
-            ]
-
-            for sel in query_selectors:
-                try:
-                    btn = self.ctx.locator(sel).first
-                    if btn.is_visible():
-                        btn.click()
-                        time.sleep(2)
-                        try:
-                            self.ctx.wait_for_load_state("networkidle", timeout=15000)
-                        except Exception:
-                            pass
-                        logger.info("查询已执行（选择器: %s）", sel)
-                        return
-                except Exception:
-                    continue
+            try:
+                btn = self.ctx.locator(self._QUERY_UNION_SEL).first
+                btn.wait_for(state="visible", timeout=3000)
+                btn.click()
+                self._wait_for_query_result()
+                logger.info("查询已执行")
+                return
+            except PlaywrightTimeout:
+                pass
 
             logger.warning("未找到查询按钮")
 
@@ -1021,6 +1580,30 @@ class FilterHandler:
             logger.error("点击查询按钮失败: %s", e)
             raise
 
+    def _wait_for_query_result(self):
+        """
+        等待查询结果渲染完成。
+
+        networkidle 在带心跳/长轮询的页面上永远不会触发，每次查询
+        都要白等满超时；改为等待两个确定的正向信号：加载遮罩消失、
+        结果表格首行出现。两者都拿不到时退回 domcontentloaded。
+        """
+        try:
+            self.ctx.locator(".el-loading-mask, .fr-loading").first.wait_for(
+                state="hidden", timeout=15000)
+        except Exception:
+            pass
+        try:
+            self.ctx.locator("table tbody tr, .fr-grid-row").first.wait_for(
+                state="visible", timeout=15000)
+            return
+        except Exception:
+            pass
+        try:
+            self.ctx.wait_for_load_state("domcontentloaded", timeout=5000)
+        except Exception:
+            pass
+
     def _find_dropdown(self, label: str):
         """
         根据标签文本查找对应的下拉框输入元素。
@@ -1048,76 +1631,98 @@ class FilterHandler:
         Returns:
             下拉框输入元素（Locator）或 None
         """
+        # 缓存命中：同一标签重复查找时跳过整条多策略探测链
+        cached = self._dropdown_cache.get(label)
+        if cached is not None:
+            try:
+                if cached.count() > 0:
+                    return cached
+            except Exception:
+                pass
+            self._dropdown_cache.pop(label, None)
+
+        # 快路径：把各策略的匹配条件并成一条 XPath 联合查询，
+        # 浏览器端一次求值即可覆盖绝大多数页面；未命中再走多策略回退
+        try:
+            xp = (
+                f'//*[self::label or self::span]'
+                f'[contains(normalize-space(.), "{label}")]'
+                f'/ancestor::*[contains(@class,"el-form-item")][1]'
+                f'//input[contains(@class,"el-input__inner")]'
+                f' | //input[contains(@placeholder,"{label}")'
+                f' or contains(@aria-label,"{label}")]'
+                f' | //select[contains(@name,"{label}")]'
+            )
+            dropdown = self.ctx.locator(f"xpath={xp}").first
+            dropdown.wait_for(state="visible", timeout=2000)
+            logger.debug("通过联合 XPath 找到下拉框: %s", label)
+            self._dropdown_cache[label] = dropdown
+            return dropdown
+        except Exception:
+            pass
+
         # 策略1：通过表单项容器查找
         try:
             form_item = self._find_form_item(label)
             if form_item is not None:
                 # 优先找 el-select 的 input
                 dropdown = self._pick_visible_input(
-                    form_item,
-                    [
-                        ".el-select .el-input__inner",
-                        ".el-select input",
-                        "input[role='combobox']",
-                        "select",
-                        ".el-input__inner",
-                    ],
-                )
+                    form_item, list(_DROPDOWN_INPUT_SELECTORS))
                 if dropdown is not None:
                     logger.debug("通过表单项容器找到下拉框: %s", label)
+                    self._dropdown_cache[label] = dropdown
                     return dropdown
         except Exception:
             pass
 
-        # 策略2：通过标签文本 + 紧邻的 el-select 查找
+        # 策略2：通过标签文本向上找含下拉输入框的最近祖先。
+        # ancestor:: 轴在浏览器端一次求值完成原先逐级 locator("..") 的爬升
         try:
-            label_el = self.ctx.locator(f"text={label}").first
-            if label_el.is_visible():
-                # 向上找父级容器，在其中寻找 el-select
-                for level in range(1, 5):
-                    ancestor = label_el
-                    for _ in range(level):
-                        ancestor = ancestor.locator("..")
-                    try:
-                        select_input = ancestor.locator(
-                            ".el-select .el-input__inner"
-                        ).first
-                        if select_input.is_visible():
-                            logger.debug(
-                                "通过标签祖先(level=%d)找到下拉框: %s",
-                                level, label,
-                            )
-                            return select_input
-                    except Exception:
-                        continue
+            select_input = self.ctx.locator(
+                f'xpath=//*[normalize-space(text())="{label}"]'
+                f'/ancestor::*[.//input[contains(@class,"el-input__inner")]][1]'
+                f'//input[contains(@class,"el-input__inner")]'
+            ).first
+            if select_input.count() > 0 and select_input.is_visible():
+                logger.debug("通过标签祖先找到下拉框: %s", label)
+                self._dropdown_cache[label] = select_input
+                return select_input
         except Exception:
             pass
 
         # 策略3：直接查找 placeholder / aria-label 匹配的输入框
+        # 三个属性选择器用 _probe 一次批量探测，只对命中的构建 Locator
         try:
             selectors = [
                 f'[aria-label*="{label}"]',
                 f'[placeholder*="{label}"]',
                 f'select[name*="{label}"]',
             ]
+            hits = self._probe({sel: sel for sel in selectors})
             for sel in selectors:
+                if not hits.get(sel):
+                    continue
                 el = self.ctx.locator(sel).first
-                if el.is_visible():
-                    logger.debug("通过属性选择器找到下拉框: %s", label)
-                    return el
+                logger.debug("通过属性选择器找到下拉框: %s", label)
+                self._dropdown_cache[label] = el
+                return el
         except Exception:
             pass
 
-        # 策略4：通过标签文本找到相邻的 input
+        # 策略4：通过标签文本找到相邻的 input。
+        # 显式 XPath 替代 text= 引擎的全树扫描，浏览器端直接索引匹配
         try:
-            label_el = self.ctx.locator(f"text={label}").first
-            if label_el.is_visible():
+            label_el = self.ctx.locator(
+                f'xpath=//*[normalize-space(text())="{label}"]'
+            ).first
+            if label_el.count() > 0 and label_el.is_visible():
                 parent = label_el.locator("..")
                 dropdown = parent.locator(
                     "select, .el-select .el-input__inner, .el-input__inner"
                 ).first
-                if dropdown.is_visible():
+                if dropdown.count() > 0 and dropdown.is_visible():
                     logger.debug("通过标签直接父级找到下拉框: %s", label)
+                    self._dropdown_cache[label] = dropdown
                     return dropdown
         except Exception:
             pass
@@ -191,6 +191,15 @@ class PageCrawler:
         logger.warning("未检测到内容区 iframe，将使用主页面上下文")
         return None
 
+    def _set_handlers_ctx(self, ctx):
+        """统一切换各 handler 的操作上下文，并重置 FilterHandler 的会话缓存"""
+        # reattach 在同一页面重新拿到 Frame 时保留探测结论，
+        # 只有 URL 变化才做完整 reset
+        self.filter_handler.reattach(ctx)
+        self.export_handler.ctx = ctx
+        self.extractor.ctx = ctx
+        self.pagination.ctx = ctx
+
     def _switch_to_content_frame(self):
         """
         检测 iframe 并将所有 handler 的操作上下文切换到 iframe 内。
@@ -202,10 +211,7 @@ class PageCrawler:
         """
         frame = self._get_content_frame()
         if frame:
-            self.filter_handler.ctx = frame
-            self.export_handler.ctx = frame
-            self.extractor.ctx = frame
-            self.pagination.ctx = frame
+            self._set_handlers_ctx(frame)
             logger.info("已将操作上下文切换到 iframe")
 
             # 检查是否可能还有未加载的内层 iframe
@@ -222,10 +228,7 @@ class PageCrawler:
                         time.sleep(2)
                         inner = self._drill_into_nested_iframe(frame)
                         if inner:
-                            self.filter_handler.ctx = inner
-                            self.export_handler.ctx = inner
-                            self.extractor.ctx = inner
-                            self.pagination.ctx = inner
+                            self._set_handlers_ctx(inner)
                             logger.info("内层 iframe 加载完成 (第%d次尝试)", retry + 1)
                             return
                     logger.warning("内层 iframe 未能在预期时间内加载完成")
@@ -233,10 +236,7 @@ class PageCrawler:
                 logger.debug("检查内层 iframe 加载状态失败: %s", e)
         else:
             # 回退到主页面
-            self.filter_handler.ctx = self.page
-            self.export_handler.ctx = self.page
-            self.extractor.ctx = self.page
-            self.pagination.ctx = self.page
+            self._set_handlers_ctx(self.page)
 
     def _is_frame_valid(self) -> bool:
         """
@@ -279,10 +279,7 @@ class PageCrawler:
         for attempt in range(5):
             frame = self._get_content_frame()
             if frame:
-                self.filter_handler.ctx = frame
-                self.export_handler.ctx = frame
-                self.extractor.ctx = frame
-                self.pagination.ctx = frame
+                self._set_handlers_ctx(frame)
                 logger.info("已重新检测到 iframe 并切换上下文 (第%d次尝试)", attempt + 1)
                 return
             logger.debug("第%d次重新检测 iframe 未找到，等待后重试...", attempt + 1)
@@ -290,10 +287,7 @@ class PageCrawler:
 
         # 最终回退到主页面
         logger.warning("多次重试仍未检测到 iframe，回退到主页面上下文")
-        self.filter_handler.ctx = self.page
-        self.export_handler.ctx = self.page
-        self.extractor.ctx = self.page
-        self.pagination.ctx = self.page
+        self._set_handlers_ctx(self.page)
 
     # ── 主流程 ────────────────────────────────────────────────────
 
@@ -465,6 +459,8 @@ class PageCrawler:
 
         # 3. 点击查询
         self.filter_handler.click_query_button()
+        # 查询会刷新表格内容，之前缓存的解析树已失效
+        self.extractor.invalidate_cache()
         time.sleep(1)
 
         # 4. 尝试导出（优先使用导出）
@@ -549,6 +545,8 @@ class PageCrawler:
             if not self.pagination.go_next_page():
                 break
 
+            # 翻页换了表格内容，不能让下一次提取撞上 TTL 内的旧缓存
+            self.extractor.invalidate_cache()
             current_page += 1
 
         logger.info("分页提取完成: 共 %d 行数据", len(all_data))
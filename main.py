@@ -36,9 +36,6 @@ from datetime import datetime
 
 import yaml
 
-from crawler.browser import BrowserManager
-from crawler.page_crawler import PageCrawler
-from storage.csv_storage import CsvStorage
 from utils.logger import setup_logger, get_logger
 from utils.validator import DataValidator, validate_csv_file
 
@@ -110,6 +107,11 @@ def run_crawler(config: dict, tasks: dict, start_date: str, end_date: str):
         start_date: 起始日期
         end_date: 结束日期
     """
+    # 延迟导入：playwright/lxml 等重依赖只在真正爬取时加载，
+    # --validate / --list-tasks 等轻量命令不必付这部分启动开销
+    from crawler.browser import BrowserManager
+    from crawler.page_crawler import PageCrawler
+
     logger = get_logger()
     target_url = config.get("target_url", "https://pmos.sx.sgcc.com.cn/#/dashboard")
 